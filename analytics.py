@@ -0,0 +1,103 @@
+"""Admin analytics computed inside MongoDB.
+
+Every statistic here is an aggregation pipeline, so only the small grouped
+result crosses the wire no matter how many jobs or applications exist.
+"""
+import math
+
+SALARY_HISTOGRAM_BINS = 20
+TOP_EMPLOYERS_LIMIT = 10
+
+CATEGORY_STATS_PIPELINE = [
+    {
+        '$group': {
+            '_id': '$category',
+            'count': {'$sum': 1},
+            'avg_salary': {'$avg': '$salary'},
+            'salary_total': {'$sum': '$salary'},
+            'salary_count': {'$sum': {'$cond': [{'$isNumber': '$salary'}, 1, 0]}}
+        }
+    },
+    {'$sort': {'count': -1, '_id': 1}}
+]
+
+
+def category_stats(db):
+    """Job count and salary totals per category (jobs without a category group under None)"""
+    return list(db.job_posts.aggregate(CATEGORY_STATS_PIPELINE))
+
+
+def job_post_stats(db):
+    """The salary range and the top employers, in one $facet"""
+    pipeline = [
+        {
+            '$facet': {
+                'salary_range': [
+                    {'$match': {'salary': {'$type': 'number'}}},
+                    {'$group': {'_id': None, 'min': {'$min': '$salary'}, 'max': {'$max': '$salary'}}}
+                ],
+                'top_employers': [
+                    {'$group': {'_id': '$employer_id', 'job_count': {'$sum': 1}}},
+                    {'$sort': {'job_count': -1}},
+                    {'$limit': TOP_EMPLOYERS_LIMIT},
+                    {'$lookup': {'from': 'users', 'localField': '_id', 'foreignField': '_id', 'as': 'employer'}},
+                    {'$project': {'job_count': 1, 'name': {'$first': '$employer.name'}}}
+                ]
+            }
+        }
+    ]
+    stats = next(db.job_posts.aggregate(pipeline))
+    stats['salary_range'] = stats['salary_range'][0] if stats['salary_range'] else None
+    return stats
+
+
+def salary_histogram(db, salary_range, bins=SALARY_HISTOGRAM_BINS):
+    """Equal-width salary histogram via $bucket, returning (edges, counts)"""
+    low, high = float(salary_range['min']), float(salary_range['max'])
+    if high <= low:
+        high = low + 1.0
+    width = (high - low) / bins
+    edges = [low + width * i for i in range(bins)] + [high]
+    # $bucket upper bounds are exclusive; nudge the last one so the maximum lands in the last bin
+    boundaries = edges[:-1] + [math.nextafter(high, math.inf)]
+    pipeline = [
+        {'$match': {'salary': {'$type': 'number'}}},
+        {'$bucket': {'groupBy': '$salary', 'boundaries': boundaries, 'output': {'count': {'$sum': 1}}}}
+    ]
+    counts_by_edge = {row['_id']: row['count'] for row in db.job_posts.aggregate(pipeline)}
+    return edges, [counts_by_edge.get(edge, 0) for edge in edges[:-1]]
+
+
+def application_stats(db):
+    """Application counts per status and per day, in one $facet"""
+    pipeline = [
+        {
+            '$facet': {
+                'statuses': [
+                    {'$match': {'status': {'$exists': True}}},
+                    {'$group': {'_id': '$status', 'count': {'$sum': 1}}},
+                    {'$sort': {'count': -1, '_id': 1}}
+                ],
+                'per_day': [
+                    {'$match': {'date_applied': {'$type': 'date'}}},
+                    {'$group': {'_id': {'$dateTrunc': {'date': '$date_applied', 'unit': 'day'}}, 'count': {'$sum': 1}}},
+                    {'$sort': {'_id': 1}}
+                ]
+            }
+        }
+    ]
+    return next(db.applications.aggregate(pipeline))
+
+
+def user_role_counts(db):
+    """Number of users per role"""
+    pipeline = [{'$group': {'_id': '$role', 'count': {'$sum': 1}}}]
+    return {row['_id']: row['count'] for row in db.users.aggregate(pipeline)}
+
+
+def overall_average_salary(categories):
+    """Average salary across all jobs, weighting each category by its number of salaried jobs"""
+    salary_count = sum(cat['salary_count'] for cat in categories)
+    if not salary_count:
+        return 0
+    return sum(cat['salary_total'] for cat in categories) / salary_count
@@ -1,23 +1,44 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file
+import click
+from flask import Flask, current_app, g, render_template, request, redirect, url_for, flash, session, jsonify, send_file
 from flask_pymongo import PyMongo
-from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
-from flask_mail import Mail, Message
-from pymongo import MongoClient
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from gridfs import GridFS
+from gridfs.errors import NoFile
 import os
+import threading
+import time
 from datetime import datetime
-import numpy as np
-import pandas as pd
-# Set matplotlib backend to 'Agg' before importing pyplot to avoid GUI issues in web app
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import seaborn as sns
 from io import BytesIO
-import base64
 from dotenv import load_dotenv
-import re
+from loaders import request_loader
+from metrics import RequestMetrics
+from mongo_pool import PoolMonitor, client_options
+from analytics import overall_average_salary
+from charts import ChartCache, preload_plotting, touch_data_version
+from events import EventBroker, LocalBackend, MongoEventBackend, TooManyStreams, format_sse
+from indexes import ensure_indexes, advise
+from passwords import HasherBusy, PasswordHasher
+from outbox import OutboxWorkerPool, enqueue_email, enqueue_emails, outbox_status, smtp_settings_from_config
+from resumes import ResumeTooLarge, collect_garbage, gridfs_download_response, release_resume, store_resume
+from recommendations import JobRecommender
+from rollups import (
+    check_rollups, read_category_stats, read_user_role_counts, rebuild_rollups,
+    record_application, record_job_posted, record_status_change, record_status_changes, record_user_registered
+)
+from export import EXPORT_FORMATS, EXPORT_MIMETYPES, export_applications, parquet_available, parse_date_range
+from job_import import IMPORT_FORMATS, detect_format, import_jobs
+from job_api import (
+    JOB_LISTING_FIELDS, MAX_API_PAGE_SIZE,
+    body_etag, has_contact_fields, job_to_json, listing_etag, listing_projection, parse_fields, readable_fields
+)
+from search import (
+    JOB_CARD_PROJECTION, FacetCache, job_filters_from_args, build_job_query, bump_jobs_generation, decode_cursor,
+    fetch_faceted_job_page, fetch_job_page, jobs_generation, normalize_filters
+)
+from result_cache import CachedStamp, ResultCache, SqliteBackend
+from user_cache import InvalidationListener, UserCache, invalidate_user
 
 # Load environment variables
 load_dotenv()
@@ -28,8 +49,35 @@ app.secret_key = os.getenv("SECRET_KEY")
 app.config['MONGO_URI'] = os.getenv("MONGO_URI")
 app.config['UPLOAD_FOLDER'] = os.getenv("UPLOAD_FOLDER")
 app.config['PLOTS_FOLDER'] = os.getenv("PLOTS_FOLDER")
+# The plotting stack loads on the first chart render unless preloaded at startup
+app.config['PRELOAD_PLOTTING'] = os.getenv("PRELOAD_PLOTTING") == 'True'
+app.config['MAX_RESUME_BYTES'] = int(os.getenv("MAX_RESUME_BYTES", 5 * 1024 * 1024))
+app.config['JOBS_PAGE_SIZE'] = int(os.getenv("JOBS_PAGE_SIZE", 20))
+app.config['JOB_IMPORT_BATCH_SIZE'] = int(os.getenv("JOB_IMPORT_BATCH_SIZE", 1000))
+app.config['BULK_STATUS_MAX'] = int(os.getenv("BULK_STATUS_MAX", 1000))
+app.config['EXPORT_BATCH_SIZE'] = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+app.config['FACET_CACHE_TTL'] = float(os.getenv("FACET_CACHE_TTL", 30))
+# Job listing result cache: bytes per worker (0 disables), and an optional SQLite file shared by
+# the workers of one host; the jobs generation that keys it is re-read at most this often
+app.config['RESULT_CACHE_BYTES'] = int(os.getenv("RESULT_CACHE_BYTES", 64 * 1024 * 1024))
+app.config['RESULT_CACHE_SHARED_PATH'] = os.getenv("RESULT_CACHE_SHARED_PATH", "")
+app.config['RESULT_CACHE_SHARED_BYTES'] = int(os.getenv("RESULT_CACHE_SHARED_BYTES", 256 * 1024 * 1024))
+app.config['JOBS_GENERATION_MAX_AGE'] = float(os.getenv("JOBS_GENERATION_MAX_AGE", 1.0))
+app.config['RECOMMENDATIONS_COUNT'] = int(os.getenv("RECOMMENDATIONS_COUNT", 5))
+app.config['RECOMMENDATIONS_REFRESH_SECONDS'] = float(os.getenv("RECOMMENDATIONS_REFRESH_SECONDS", 30))
+# Application event streams: 'mongo' carries events between workers, 'local' keeps them in-process
+app.config['EVENTS_BACKEND'] = os.getenv("EVENTS_BACKEND", "mongo")
+app.config['EVENTS_MAX_STREAMS'] = int(os.getenv("EVENTS_MAX_STREAMS", 100))
+app.config['EVENTS_HEARTBEAT_SECONDS'] = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+app.config['USER_CACHE_SIZE'] = int(os.getenv("USER_CACHE_SIZE", 10000))
+app.config['USER_CACHE_TTL'] = float(os.getenv("USER_CACHE_TTL", 60))
+# Password hashing: any werkzeug method string, run on a bounded pool of hashing threads
+app.config['PASSWORD_HASH_METHOD'] = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+app.config['PASSWORD_HASH_QUEUE'] = int(os.getenv("PASSWORD_HASH_QUEUE", 64))
+app.config['CREATE_INDEXES_ON_STARTUP'] = os.getenv("CREATE_INDEXES_ON_STARTUP", "True") == 'True'
 
-# Flask-Mail Config
+# Mail Config
 app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER')
 app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT'))
 app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS') == 'True'
@@ -37,14 +85,153 @@ app.config['MAIL_USE_SSL'] = os.getenv('MAIL_USE_SSL') == 'True'  # Added SSL co
 app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
 app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
 
-# Initialize extensions
-mongo = PyMongo(app)
-mail = Mail(app)
+# Email outbox workers (0 disables the in-process pool, e.g. when running `flask outbox-worker`)
+app.config['OUTBOX_WORKERS'] = int(os.getenv('OUTBOX_WORKERS', 2))
+app.config['OUTBOX_BATCH_SIZE'] = int(os.getenv('OUTBOX_BATCH_SIZE', 50))
+app.config['OUTBOX_MAX_ATTEMPTS'] = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+
+# MongoDB connection pool; the database name comes from MONGO_URI
+app.config['MONGO_MAX_POOL_SIZE'] = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+app.config['MONGO_MIN_POOL_SIZE'] = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+app.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'] = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000))
+app.config['MONGO_READ_PREFERENCE'] = os.getenv("MONGO_READ_PREFERENCE", "primary")
+app.config['MONGO_COMPRESSORS'] = os.getenv("MONGO_COMPRESSORS", "")
+
+# Request metrics: N+1 warnings past this many identical query shapes, slow request log (0 disables)
+app.config['N_PLUS_ONE_THRESHOLD'] = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))
+app.config['SLOW_REQUEST_MS'] = float(os.getenv("SLOW_REQUEST_MS", 0))
+app.config['METRICS_TOKEN'] = os.getenv("METRICS_TOKEN", "")
+
+# Initialize extensions: one client, shared by the routes and GridFS
+pool_monitor = PoolMonitor(app.config['MONGO_MAX_POOL_SIZE'])
+request_metrics = RequestMetrics(app.config['N_PLUS_ONE_THRESHOLD'], app.config['SLOW_REQUEST_MS'] / 1000)
+mongo = PyMongo(app, **client_options(app.config, [pool_monitor, request_metrics]))
+
+@app.before_request
+def start_request_metrics():
+    request_metrics.begin()
+
+@app.after_request
+def finish_request_metrics(response):
+    request_metrics.finish(request.endpoint or 'unmatched', response.status_code)
+    return response
 
 # Initialize GridFS
-client = MongoClient(os.getenv("MONGO_URI"))
-db = client.job_portal_db
-fs = GridFS(db)
+fs = GridFS(mongo.db)
+
+# Ensure the registered indexes exist (idempotent), once per process on its first
+# request rather than at import, so CLI commands such as create-indexes do not build them twice
+indexes_ensured = False
+indexes_lock = threading.Lock()
+
+@app.before_request
+def ensure_indexes_once():
+    global indexes_ensured
+    if indexes_ensured or not app.config['CREATE_INDEXES_ON_STARTUP']:
+        return
+    with indexes_lock:
+        if not indexes_ensured:
+            ensure_indexes(mongo.db)
+            indexes_ensured = True
+
+# Email outbox worker pool
+def create_outbox_pool(workers):
+    return OutboxWorkerPool(
+        mongo.db,
+        smtp_settings_from_config(app.config),
+        workers=workers,
+        batch_size=app.config['OUTBOX_BATCH_SIZE'],
+        max_attempts=app.config['OUTBOX_MAX_ATTEMPTS']
+    )
+
+# The in-process pool starts with the first request each worker serves, never in CLI commands
+outbox_pool = create_outbox_pool(app.config['OUTBOX_WORKERS'])
+
+@app.before_request
+def start_outbox_pool():
+    if app.config['OUTBOX_WORKERS']:
+        outbox_pool.ensure_started()
+
+# Admin charts, rendered in the background once per data version
+chart_cache = ChartCache(mongo.db, app.config['PLOTS_FOLDER'], timer=request_metrics.track)
+if app.config['PRELOAD_PLOTTING']:
+    preload_plotting()
+
+def admin_plot_urls():
+    """URLs of the newest rendered admin charts, keyed by plot name"""
+    return {name: url_for('admin_chart', filename=filename) for name, filename in chart_cache.get().items()}
+
+# Job listing results, keyed by the jobs generation so any job write invalidates them
+jobs_stamp = CachedStamp(lambda: jobs_generation(mongo.db), app.config['JOBS_GENERATION_MAX_AGE'])
+result_cache = ResultCache(
+    app.config['RESULT_CACHE_BYTES'],
+    shared=SqliteBackend(app.config['RESULT_CACHE_SHARED_PATH'], app.config['RESULT_CACHE_SHARED_BYTES'])
+    if app.config['RESULT_CACHE_SHARED_PATH'] else None
+)
+
+# Facet counts and first pages of popular job searches, kept for a few seconds
+facet_cache = FacetCache(app.config['FACET_CACHE_TTL'])
+
+# "Recommended for you" index over job texts, built in the background on first use
+recommender = JobRecommender(mongo.db, refresh_seconds=app.config['RECOMMENDATIONS_REFRESH_SECONDS'])
+
+# Application events for the users' open /events streams
+event_broker = EventBroker(
+    MongoEventBackend(mongo.db) if app.config['EVENTS_BACKEND'] == 'mongo' else LocalBackend(),
+    max_streams=app.config['EVENTS_MAX_STREAMS']
+)
+
+def publish_status_change(application, job, new_status):
+    """Tell the job seeker's and the employer's open streams that an application changed status"""
+    event_broker.publish([application['job_seeker_id'], session['user_id']], 'application_status', {
+        'application_id': str(application['_id']),
+        'job_id': str(application['job_id']),
+        'job_title': job.get('title', '') if job else '',
+        'previous_status': application.get('status'),
+        'status': new_status
+    })
+
+# Process-level user cache, invalidated across workers through a capped collection
+# (the listener starts on first use, so it runs in every forked worker and never in CLI commands)
+user_cache = UserCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
+user_cache_listener = InvalidationListener(mongo.db, user_cache)
+
+def get_user(user_id):
+    """A user document, memoized for the request and cached for the process"""
+    if '_users' not in g:
+        g._users = {}
+    if user_id not in g._users:
+        user_cache_listener.ensure_started()
+        g._users[user_id] = user_cache.get(user_id, lambda: mongo.db.users.find_one({'_id': user_id}))
+    return g._users[user_id]
+
+def get_session_user():
+    """The logged-in user's document"""
+    return get_user(session['user_id'])
+
+def user_changed(user_id):
+    """Invalidate a user after their document was modified"""
+    if '_users' in g:
+        g._users.pop(user_id, None)
+    user_cache_listener.ensure_started()
+    invalidate_user(mongo.db, user_cache, user_id)
+
+# Password hashing runs off the request threads, on a fixed CPU budget
+password_hasher = PasswordHasher(
+    app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    queue_size=app.config['PASSWORD_HASH_QUEUE']
+)
+
+def upgrade_password_hash(user, password):
+    """Re-hash a just-verified password with the current parameters"""
+    try:
+        new_hash = password_hasher.hash(password)
+    except HasherBusy:
+        # Leave it for a later login
+        return
+    mongo.db.users.update_one({'_id': user['_id'], 'password': user['password']}, {'$set': {'password': new_hash}})
+    user_changed(user['_id'])
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = set(os.getenv("ALLOWED_EXTENSIONS", "").split(','))
@@ -52,26 +239,49 @@ ALLOWED_EXTENSIONS = set(os.getenv("ALLOWED_EXTENSIONS", "").split(','))
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+@request_metrics.timed('send_email')
 def send_email(to, subject, body):
+    """Queue an email in the outbox; the outbox workers deliver it"""
     try:
-        msg = Message(
-            subject, 
-            sender=(app.config['MAIL_USERNAME'], 'Job Portal'),  # Set sender name as 'Job Portal'
-            recipients=[to]
+        enqueue_email(
+            mongo.db, to, subject, body,
+            html=f"<p>{body.replace(chr(10), '<br>')}</p>"  # Convert newlines to HTML line breaks
         )
-        msg.body = body
-        msg.html = f"<p>{body.replace(chr(10), '<br>')}</p>"  # Convert newlines to HTML line breaks
-        mail.send(msg)
-        print(f"Email sent successfully to: {to}, Subject: {subject}")  # Debug print
+        outbox_pool.wake()
         return True
     except Exception as e:
-        print(f"Error sending email to {to}: {str(e)}")
+        print(f"Error queueing email to {to}: {str(e)}")
         return False
 
+@request_metrics.timed('send_email')
+def send_emails(messages):
+    """Queue several (to, subject, body) emails in the outbox with one write"""
+    try:
+        enqueue_emails(
+            mongo.db,
+            [(to, subject, body, f"<p>{body.replace(chr(10), '<br>')}</p>") for to, subject, body in messages]
+        )
+        outbox_pool.wake()
+        return True
+    except Exception as e:
+        print(f"Error queueing {len(messages)} emails: {str(e)}")
+        return False
+
+def application_status_email(job_seeker, job, application, new_status):
+    """Subject and body of the email telling a job seeker their application status changed"""
+    subject = f"Application Status Update for {job['title']}"
+    if new_status == 'Accepted':
+        body = f"Dear {job_seeker['name']},\n\nGood news! Your application for the position \"{job['title']}\" has been ACCEPTED by the employer.\n\nWe congratulate you and wish you success in your new role!\n\nBest regards,\nJob Portal Team"
+    elif new_status == 'Rejected':
+        body = f"Dear {job_seeker['name']},\n\nWe regret to inform you that your application for the position \"{job['title']}\" has been REJECTED by the employer.\n\nWe encourage you to keep applying to other opportunities on our platform.\n\nBest regards,\nJob Portal Team"
+    else:
+        body = f"Dear {job_seeker['name']},\n\nYour application status for the position \"{job['title']}\" has been updated to: {new_status}\n\nApplication Date: {application['date_applied'].strftime('%Y-%m-%d %H:%M:%S')}\n\nBest regards,\nJob Portal Team"
+    return subject, body
+
 @app.route('/')
 def index():
     if 'user_id' in session:
-        user = mongo.db.users.find_one({'_id': session['user_id']})
+        user = get_session_user()
         if user:
             if user['role'] == 'job_seeker':
                 return redirect(url_for('job_seeker_dashboard'))
@@ -107,7 +317,11 @@ def register():
             return render_template('register.html')
         
         # Hash password and create user
-        hashed_password = generate_password_hash(password)
+        try:
+            hashed_password = password_hasher.hash(password)
+        except HasherBusy:
+            flash('The server is busy, please try again in a moment.')
+            return render_template('register.html'), 503
         user_data = {
             'name': name,
             'email': email,
@@ -115,7 +329,13 @@ def register():
             'role': role
         }
         
-        result = mongo.db.users.insert_one(user_data)
+        try:
+            result = mongo.db.users.insert_one(user_data)
+        except DuplicateKeyError:
+            # Lost a race with a concurrent registration for the same email
+            flash('User with this email already exists!')
+            return render_template('register.html')
+        record_user_registered(mongo.db, role)
         flash('Registration successful!')
         return redirect(url_for('login'))
     
@@ -129,7 +349,16 @@ def login():
         
         # Find user
         user = mongo.db.users.find_one({'email': email})
-        if user and check_password_hash(user['password'], password):
+        try:
+            valid = user is not None and password_hasher.verify(user['password'], password)
+        except HasherBusy:
+            flash('The server is busy, please try again in a moment.')
+            return render_template('login.html'), 503
+        if valid:
+            # Stored with older hash parameters; upgrade it while the plain password is at hand
+            if password_hasher.needs_rehash(user['password']):
+                upgrade_password_hash(user, password)
+            
             session['user_id'] = user['_id']
             session['role'] = user['role']
             session['name'] = user['name']
@@ -160,52 +389,122 @@ def job_seeker_dashboard():
         return redirect(url_for('login'))
     
     # Get the current user
-    user = mongo.db.users.find_one({'_id': session['user_id']})
+    user = get_session_user()
     
     # Get query parameters for search and filter
-    search_query = request.args.get('search', '').strip()
-    category = request.args.get('category', '').strip()
-    location = request.args.get('location', '').strip()
-    min_salary = request.args.get('min_salary', '').strip()
-    
-    # Build query for filtering jobs
-    query = {}
-    
-    # Search query - search in title, company name, description, and requirements
-    if search_query:
-        query['$or'] = [
-            {'title': {'$regex': search_query, '$options': 'i'}},
-            {'company_name': {'$regex': search_query, '$options': 'i'}},
-            {'description': {'$regex': search_query, '$options': 'i'}},
-            {'requirements': {'$regex': search_query, '$options': 'i'}}
-        ]
-    
-    # Category filter
-    if category:
-        query['category'] = category
-    
-    # Location filter
-    if location:
-        query['location'] = {'$regex': location, '$options': 'i'}
-    
-    # Minimum salary filter
-    if min_salary and min_salary.isdigit():
-        query['salary'] = {'$gte': float(min_salary)}
-    
-    # Get filtered job posts
-    jobs = list(mongo.db.job_posts.find(query))
+    filters = job_filters_from_args(request.args)
+    
+    # Get one page of filtered job posts, ranked by relevance when searching, with the
+    # per-category, location and salary band counts of the whole result; cached until job_posts changes
+    cursor = request.args.get('cursor', '')
+    page_size = current_app.config['JOBS_PAGE_SIZE']
+    generation = jobs_stamp.value()
+    jobs, next_cursor, facets = result_cache.get_or_load(
+        ('dashboard', generation, normalize_filters(filters), cursor, page_size),
+        lambda: fetch_faceted_job_page(mongo.db.job_posts, filters, cursor=cursor, page_size=page_size,
+                                       cache=facet_cache, generation=generation)
+    )
     
     # Get user's applications
     applications = list(mongo.db.applications.find({'job_seeker_id': session['user_id']}).sort('date_applied', -1))
     
-    # Join with job details
+    # Join with job details (one batched query for all applications)
+    jobs_by_id = request_loader(mongo.db.job_posts, {'title': 1, 'company_name': 1}).load_many(
+        [app['job_id'] for app in applications]
+    )
     for app in applications:
-        job = mongo.db.job_posts.find_one({'_id': app['job_id']})
+        job = jobs_by_id.get(app['job_id'])
         if job:
             app['job_title'] = job['title']
             app['company'] = job.get('company_name', 'Unknown')
     
-    return render_template('job_seeker_dashboard.html', jobs=jobs, filtered_jobs=jobs, applications=applications, user=user)
+    # Jobs matching the seeker's profile, leaving out the ones already applied to
+    recommended_jobs = []
+    if current_app.config['RECOMMENDATIONS_COUNT'] and user.get('profile'):
+        ranked = recommender.recommend(
+            user['profile'],
+            k=current_app.config['RECOMMENDATIONS_COUNT'],
+            exclude={application['job_id'] for application in applications}
+        )
+        if ranked:
+            cards = {job['_id']: job for job in mongo.db.job_posts.find(
+                {'_id': {'$in': [job_id for job_id, _ in ranked]}}, JOB_CARD_PROJECTION
+            )}
+            recommended_jobs = [cards[job_id] for job_id, _ in ranked if job_id in cards]
+    
+    return render_template('job_seeker_dashboard.html', jobs=jobs, filtered_jobs=jobs, applications=applications, user=user,
+                          next_cursor=next_cursor, facets=facets, recommended_jobs=recommended_jobs)
+
+@app.route('/api/jobs')
+def api_jobs():
+    filters = job_filters_from_args(request.args)
+    cursor = request.args.get('cursor', '')
+    if cursor and decode_cursor(cursor) is None:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    limit = request.args.get('limit', '')
+    if limit and not limit.isdigit():
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    page_size = min(max(int(limit or app.config['JOBS_PAGE_SIZE']), 1), MAX_API_PAGE_SIZE)
+    try:
+        fields = parse_fields(request.args.get('fields', ''), JOB_LISTING_FIELDS, readable_fields('user_id' in session))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # The ETag is known before the query runs, so an unchanged poll costs one small lookup
+    generation = jobs_stamp.value()
+    requested = bool(request.args.get('fields'))
+    etag = listing_etag(generation, filters, cursor, page_size, fields, requested)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        def load_page():
+            jobs, next_cursor = fetch_job_page(
+                mongo.db.job_posts,
+                build_job_query(filters),
+                cursor=cursor,
+                page_size=page_size,
+                projection=listing_projection(fields, requested)
+            )
+            return {'jobs': [job_to_json(job, fields) for job in jobs], 'next_cursor': next_cursor}
+        
+        key = ('api_jobs', generation, normalize_filters(filters), cursor, page_size, fields, requested)
+        response = jsonify(result_cache.get_or_load(key, load_page))
+    
+    response.set_etag(etag)
+    if has_contact_fields(fields):
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/jobs/<job_id>')
+def api_job(job_id):
+    from bson import ObjectId
+    try:
+        job_object_id = ObjectId(job_id)
+    except:
+        return jsonify({'error': 'Job not found'}), 404
+    try:
+        allowed = readable_fields('user_id' in session)
+        fields = parse_fields(request.args.get('fields', ''), allowed, allowed)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    job = mongo.db.job_posts.find_one({'_id': job_object_id}, {field: 1 for field in fields})
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    response = jsonify(job_to_json(job, fields))
+    response.set_etag(body_etag(response.get_data()))
+    if has_contact_fields(fields):
+        response.cache_control.private = True
+    else:
+        response.cache_control.public = True
+    # Which fields come back by default depends on the session
+    response.vary.add('Cookie')
+    response.cache_control.max_age = 300
+    return response.make_conditional(request)
 
 @app.route('/employer/dashboard')
 def employer_dashboard():
@@ -215,24 +514,37 @@ def employer_dashboard():
     # Get jobs posted by this employer
     jobs = list(mongo.db.job_posts.find({'employer_id': session['user_id']}))
     
-    # Count applications for each job
+    # Count applications for each job in a single aggregation
+    job_ids = [job['_id'] for job in jobs]
+    applications_count = {}
+    if job_ids:
+        pipeline = [
+            {'$match': {'job_id': {'$in': job_ids}}},
+            {'$group': {'_id': '$job_id', 'count': {'$sum': 1}}}
+        ]
+        applications_count = {row['_id']: row['count'] for row in mongo.db.applications.aggregate(pipeline)}
     for job in jobs:
-        job['applications_count'] = mongo.db.applications.count_documents({'job_id': job['_id']})
+        job['applications_count'] = applications_count.get(job['_id'], 0)
     
     # Get all applications for these jobs
-    job_ids = [job['_id'] for job in jobs]
     applications = []
     if job_ids:
         applications = list(mongo.db.applications.find({'job_id': {'$in': job_ids}}).sort('date_applied', -1))
         
-        # Join with job seeker details
+        # Join with job seeker details (one batched query) and the jobs loaded above
+        job_seekers = request_loader(mongo.db.users, {'name': 1, 'email': 1}).load_many(
+            [app['job_seeker_id'] for app in applications]
+        )
+        job_loader = request_loader(mongo.db.job_posts)
+        job_loader.prime(jobs)
+        jobs_by_id = job_loader.load_many(job_ids)
         for app in applications:
-            job_seeker = mongo.db.users.find_one({'_id': app['job_seeker_id']})
+            job_seeker = job_seekers.get(app['job_seeker_id'])
             if job_seeker:
                 app['job_seeker_name'] = job_seeker['name']
                 app['job_seeker_email'] = job_seeker['email']
             
-            job = mongo.db.job_posts.find_one({'_id': app['job_id']})
+            job = jobs_by_id.get(app['job_id'])
             if job:
                 app['job_title'] = job['title']
     
@@ -243,18 +555,18 @@ def admin_dashboard():
     if 'user_id' not in session or session.get('role') != 'admin':
         return redirect(url_for('login'))
     
-    # Get counts for dashboard
-    total_users = mongo.db.users.count_documents({})
-    total_job_posts = mongo.db.job_posts.count_documents({})
-    total_applications = mongo.db.applications.count_documents({})
+    # Get counts for dashboard from collection metadata; exact counts would scan each collection
+    total_users = mongo.db.users.estimated_document_count()
+    total_job_posts = mongo.db.job_posts.estimated_document_count()
+    total_applications = mongo.db.applications.estimated_document_count()
     
     # Get recent activity
     recent_users = list(mongo.db.users.find().sort('_id', -1).limit(5))
     recent_jobs = list(mongo.db.job_posts.find().sort('_id', -1).limit(5))
     recent_applications = list(mongo.db.applications.find().sort('_id', -1).limit(5))
     
-    # Generate visualizations
-    plot_paths = generate_admin_plots()
+    # Get the cached visualizations
+    plot_paths = admin_plot_urls()
     
     return render_template('admin_dashboard.html', 
                           total_users=total_users,
@@ -265,180 +577,39 @@ def admin_dashboard():
                           recent_applications=recent_applications,
                           plot_paths=plot_paths)
 
-def generate_admin_plots():
-    """Generate admin dashboard visualizations"""
-    plots = {}
-    
-    # Bar Chart - Job count per category
-    try:
-        jobs = list(mongo.db.job_posts.find({}, {'category': 1}))
-        categories = [job['category'] for job in jobs if 'category' in job]
-        
-        if categories:
-            df = pd.DataFrame(categories, columns=['category'])
-            category_counts = df['category'].value_counts()
-            
-            plt.figure(figsize=(10, 6))
-            plt.bar(category_counts.index, category_counts.values)
-            plt.title('Job Count per Category')
-            plt.xlabel('Category')
-            plt.ylabel('Count')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            plot_path = os.path.join(app.config['PLOTS_FOLDER'], 'job_categories.png')
-            plt.savefig(plot_path)
-            plt.close()
-            
-            plots['job_categories'] = plot_path
-    except Exception as e:
-        print(f"Error generating job categories plot: {str(e)}")
-    
-    # Pie Chart - Application status distribution
-    try:
-        applications = list(mongo.db.applications.find({}, {'status': 1}))
-        statuses = [app['status'] for app in applications if 'status' in app]
-        
-        if statuses:
-            df = pd.DataFrame(statuses, columns=['status'])
-            status_counts = df['status'].value_counts()
-            
-            plt.figure(figsize=(8, 6))
-            plt.pie(status_counts.values, labels=status_counts.index, autopct='%1.1f%%')
-            plt.title('Application Status Distribution')
-            plt.tight_layout()
-            
-            plot_path = os.path.join(app.config['PLOTS_FOLDER'], 'application_status.png')
-            plt.savefig(plot_path)
-            plt.close()
-            
-            plots['application_status'] = plot_path
-    except Exception as e:
-        print(f"Error generating application status plot: {str(e)}")
-    
-    # Line Chart - Applications over time
-    try:
-        applications = list(mongo.db.applications.find({}, {'date_applied': 1, 'status': 1}))
-        dates = [app['date_applied'].strftime('%Y-%m-%d') for app in applications if 'date_applied' in app]
-        
-        if dates:
-            df = pd.DataFrame(dates, columns=['date'])
-            date_counts = df['date'].value_counts().sort_index()
-            
-            plt.figure(figsize=(10, 6))
-            plt.plot(date_counts.index, date_counts.values, marker='o')
-            plt.title('Applications Over Time')
-            plt.xlabel('Date')
-            plt.ylabel('Number of Applications')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            plot_path = os.path.join(app.config['PLOTS_FOLDER'], 'applications_over_time.png')
-            plt.savefig(plot_path)
-            plt.close()
-            
-            plots['applications_over_time'] = plot_path
-    except Exception as e:
-        print(f"Error generating applications over time plot: {str(e)}")
-    
-    # Histogram - Salary distribution
-    try:
-        jobs = list(mongo.db.job_posts.find({}, {'salary': 1}))
-        salaries = [job['salary'] for job in jobs if 'salary' in job and job['salary'] is not None]
-        
-        if salaries:
-            plt.figure(figsize=(10, 6))
-            plt.hist(salaries, bins=20, edgecolor='black')
-            plt.title('Salary Distribution')
-            plt.xlabel('Salary')
-            plt.ylabel('Frequency')
-            plt.tight_layout()
-            
-            plot_path = os.path.join(app.config['PLOTS_FOLDER'], 'salary_distribution.png')
-            plt.savefig(plot_path)
-            plt.close()
-            
-            plots['salary_distribution'] = plot_path
-    except Exception as e:
-        print(f"Error generating salary distribution plot: {str(e)}")
+@app.route('/admin/charts/<filename>')
+def admin_chart(filename):
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return redirect(url_for('login'))
     
-    # Bar Chart - Most active employers
-    try:
-        # Count jobs per employer
-        pipeline = [
-            {
-                '$group': {
-                    '_id': '$employer_id',
-                    'job_count': {'$sum': 1}
-                }
-            },
-            {
-                '$sort': {'job_count': -1}
-            },
-            {
-                '$limit': 10
-            }
-        ]
-        
-        employer_counts = list(mongo.db.job_posts.aggregate(pipeline))
-        
-        if employer_counts:
-            # Get employer names
-            employer_ids = [emp['_id'] for emp in employer_counts]
-            employers = list(mongo.db.users.find({'_id': {'$in': employer_ids}}, {'name': 1}))
-            employer_names = {emp['_id']: emp['name'] for emp in employers}
-            
-            employer_labels = [employer_names.get(emp['_id'], str(emp['_id'])) for emp in employer_counts]
-            job_counts = [emp['job_count'] for emp in employer_counts]
-            
-            plt.figure(figsize=(10, 6))
-            plt.bar(employer_labels, job_counts)
-            plt.title('Top 10 Most Active Employers')
-            plt.xlabel('Employer')
-            plt.ylabel('Number of Jobs Posted')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            plot_path = os.path.join(app.config['PLOTS_FOLDER'], 'top_employers.png')
-            plt.savefig(plot_path)
-            plt.close()
-            
-            plots['top_employers'] = plot_path
-    except Exception as e:
-        print(f"Error generating top employers plot: {str(e)}")
+    data = chart_cache.read(filename)
+    if data is None:
+        return 'Chart not found', 404
     
-    return plots
+    # Chart filenames carry their data version, so a URL's content never changes
+    response = send_file(BytesIO(data), mimetype='image/png', etag=filename, max_age=31536000, conditional=True)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
 
 @app.route('/admin/analytics')
 def admin_analytics():
     if 'user_id' not in session or session.get('role') != 'admin':
         return redirect(url_for('login'))
     
-    # Calculate additional analytics
-    pipeline = [
-        {
-            '$group': {
-                '_id': '$category',
-                'avg_salary': {'$avg': '$salary'},
-                'count': {'$sum': 1}
-            }
-        }
-    ]
-    
-    category_analytics = list(mongo.db.job_posts.aggregate(pipeline))
+    # Category salary analytics, from the rollups
+    categories = read_category_stats(mongo.db)
+    category_analytics = [cat for cat in categories if cat['_id'] is not None]
     
-    # Calculate overall average salary
-    overall_avg_salary = 0
-    if category_analytics:
-        total_salary = sum(cat['avg_salary'] for cat in category_analytics)
-        overall_avg_salary = total_salary / len(category_analytics)
+    # Calculate overall average salary (weighted by each category's job count)
+    overall_avg_salary = overall_average_salary(categories)
     
     # Get user counts by role
-    user_counts = {}
-    for role in ['job_seeker', 'employer']:
-        user_counts[role] = mongo.db.users.count_documents({'role': role})
+    role_counts = read_user_role_counts(mongo.db)
+    user_counts = {role: role_counts.get(role, 0) for role in ['job_seeker', 'employer']}
     
-    plot_paths = generate_admin_plots()
+    plot_paths = admin_plot_urls()
     
     return render_template('admin_analytics.html', 
                           category_analytics=category_analytics, 
@@ -446,6 +617,90 @@ def admin_analytics():
                           overall_avg_salary=overall_avg_salary,
                           plot_paths=plot_paths)
 
+@app.route('/admin/cache_stats')
+def admin_cache_stats():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return redirect(url_for('login'))
+    
+    return jsonify({
+        'user_cache': user_cache.stats(),
+        'result_cache': result_cache.stats(),
+        'event_streams': event_broker.stats(),
+        'mongo_pool': pool_monitor.stats()
+    })
+
+@app.route('/admin/export/applications')
+def admin_export_applications():
+    if 'user_id' not in session or session.get('role') != 'admin':
+        return redirect(url_for('login'))
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unknown format; use one of {', '.join(EXPORT_FORMATS)}"}), 400
+    if fmt == 'parquet' and not parquet_available():
+        return jsonify({'error': 'Parquet export needs pyarrow installed'}), 400
+    try:
+        query = parse_date_range(request.args.get('since'), request.args.get('until'))
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    
+    # Streamed chunk by chunk, so the download starts at once and the worker holds one batch
+    chunks = export_applications(mongo.db, fmt, query, app.config['EXPORT_BATCH_SIZE'])
+    filename = f"applications-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    return app.response_class(chunks, mimetype=EXPORT_MIMETYPES[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/metrics')
+def metrics():
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return 'Unauthorized', 401
+
+    gauges = {
+        'portal_user_cache': user_cache.stats(),
+        'portal_result_cache': result_cache.stats(),
+        'portal_event_streams': event_broker.stats(),
+        'portal_mongo_pool': pool_monitor.stats()
+    }
+    return app.response_class(request_metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+@app.route('/events')
+def events():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    user_id = session['user_id']
+    try:
+        subscription = event_broker.subscribe(user_id)
+    except TooManyStreams:
+        return 'Too many open event streams', 503
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    heartbeat = app.config['EVENTS_HEARTBEAT_SECONDS']
+    
+    def stream():
+        try:
+            # Events missed while reconnecting come first, then live ones; the keepalive
+            # comments let proxies and the server notice a client that went away
+            yield 'retry: 5000\n\n'
+            replayed = set()
+            if last_event_id:
+                for event in event_broker.replay(user_id, last_event_id):
+                    replayed.add(event['id'])
+                    yield format_sse(event)
+            while True:
+                event = subscription.get(heartbeat)
+                if event is None:
+                    yield ': keepalive\n\n'
+                elif event['id'] not in replayed:
+                    yield format_sse(event)
+        finally:
+            subscription.close()
+    
+    return app.response_class(stream(), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/post_job', methods=['GET', 'POST'])
 def post_job():
     if 'user_id' not in session or session.get('role') != 'employer':
@@ -484,11 +739,33 @@ def post_job():
         }
         
         mongo.db.job_posts.insert_one(job_data)
+        bump_jobs_generation(mongo.db)
+        jobs_stamp.invalidate()
+        recommender.add_job(job_data)
+        record_job_posted(mongo.db, job_data)
         flash('Job posted successfully!')
         return redirect(url_for('employer_dashboard'))
     
     return render_template('post_job.html')
 
+@app.route('/employer/import_jobs', methods=['POST'])
+def import_jobs_route():
+    if 'user_id' not in session or session.get('role') != 'employer':
+        return redirect(url_for('login'))
+    
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({'error': 'No file uploaded'}), 400
+    fmt = request.form.get('format') or detect_format(upload.filename)
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({'error': 'Upload a .csv or .ndjson file, or pass format=csv|ndjson'}), 400
+    
+    # Werkzeug spools large uploads to disk, and rows are read from the stream as they are inserted
+    report = import_jobs(mongo.db, upload.stream, fmt, session['user_id'],
+                         batch_size=app.config['JOB_IMPORT_BATCH_SIZE'])
+    jobs_stamp.invalidate()
+    return jsonify(report)
+
 @app.route('/apply_job/<job_id>', methods=['POST'])
 def apply_job(job_id):
     if 'user_id' not in session or session.get('role') != 'job_seeker':
@@ -502,7 +779,7 @@ def apply_job(job_id):
         return redirect(url_for('job_seeker_dashboard'))
     
     # Get the current user's profile
-    user = mongo.db.users.find_one({'_id': session['user_id']})
+    user = get_session_user()
     
     # Check if the user has a complete profile and resume
     profile_complete = True
@@ -519,14 +796,15 @@ def apply_job(job_id):
         flash('Please complete your profile and upload a resume before applying for jobs.')
         return redirect(url_for('profile'))
     
-    # Check if already applied
-    existing_application = mongo.db.applications.find_one({
-        'job_id': job_object_id,
-        'job_seeker_id': session['user_id']
-    })
+    # The job and its employer's contact details in one projected lookup
+    job = next(mongo.db.job_posts.aggregate([
+        {'$match': {'_id': job_object_id}},
+        {'$lookup': {'from': 'users', 'localField': 'employer_id', 'foreignField': '_id', 'as': 'employer'}},
+        {'$project': {'title': 1, 'employer_id': 1, 'employer.name': 1, 'employer.email': 1}}
+    ]), None)
     
-    if existing_application:
-        flash('You have already applied for this job!')
+    if not job:
+        flash('Job not found')
         return redirect(url_for('job_seeker_dashboard'))
     
     application_data = {
@@ -536,26 +814,45 @@ def apply_job(job_id):
         'date_applied': datetime.utcnow()
     }
     
-    result = mongo.db.applications.insert_one(application_data)
+    # The unique applications_job_seeker index is what prevents duplicate applications: of
+    # concurrent submissions only one inserts, the others end in DuplicateKeyError. The upsert
+    # only spares a repeat submission the failed insert; without the index, concurrent ones can
+    # both insert (flask create-indexes reports the index when it cannot be built)
+    try:
+        result = mongo.db.applications.update_one(
+            {'job_id': job_object_id, 'job_seeker_id': session['user_id']},
+            {'$setOnInsert': application_data},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        result = None
+    if result is None or result.upserted_id is None:
+        flash('You have already applied for this job!')
+        return redirect(url_for('job_seeker_dashboard'))
+    application_id = result.upserted_id
+    record_application(mongo.db, application_data)
+    event_broker.publish([session['user_id'], job.get('employer_id')], 'application_created', {
+        'application_id': str(application_id),
+        'job_id': job_id,
+        'job_title': job['title'],
+        'applicant_name': user['name'],
+        'status': 'Pending',
+        'date_applied': application_data['date_applied'].isoformat()
+    })
     
-    # Send confirmation email to job seeker
-    job = mongo.db.job_posts.find_one({'_id': job_object_id})
-    user = mongo.db.users.find_one({'_id': session['user_id']})
+    # Email to job seeker
+    subject = f"Application Received for {job['title']}"
+    body = f"Dear {user['name']},\n\nYour application for the position \"{job['title']}\" has been received successfully.\n\nApplication ID: {str(application_id)}\nApplied on: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}\nStatus: Pending\n\nWe will notify you once the employer reviews your application.\n\nBest regards,\nJob Portal Team"
+    messages = [(user['email'], subject, body)]
     
-    if job and user:
-        # Email to job seeker
-        subject = f"Application Received for {job['title']}"
-        body = f"Dear {user['name']},\n\nYour application for the position \"{job['title']}\" has been received successfully.\n\nApplication ID: {str(result.inserted_id)}\nApplied on: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}\nStatus: Pending\n\nWe will notify you once the employer reviews your application.\n\nBest regards,\nJob Portal Team"
-        
-        send_email(user['email'], subject, body)
-        
-        # Email to employer about new application
-        employer = mongo.db.users.find_one({'_id': job['employer_id']})
-        if employer:
-            emp_subject = f"New Application for {job['title']}"
-            emp_body = f"Dear {employer['name']},\n\nYou have received a new application for the position \"{job['title']}\".\n\nApplicant: {user['name']}\nEmail: {user['email']}\nApplication ID: {str(result.inserted_id)}\nApplied on: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}\nCurrent Status: Pending\n\nPlease review the application in your employer dashboard.\n\nBest regards,\nJob Portal Team"
-            
-            send_email(employer['email'], emp_subject, emp_body)
+    # Email to employer about new application
+    if job['employer']:
+        employer = job['employer'][0]
+        emp_subject = f"New Application for {job['title']}"
+        emp_body = f"Dear {employer['name']},\n\nYou have received a new application for the position \"{job['title']}\".\n\nApplicant: {user['name']}\nEmail: {user['email']}\nApplication ID: {str(application_id)}\nApplied on: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}\nCurrent Status: Pending\n\nPlease review the application in your employer dashboard.\n\nBest regards,\nJob Portal Team"
+        messages.append((employer['email'], emp_subject, emp_body))
+    
+    send_emails(messages)
     
     flash('Application submitted successfully!')
     return redirect(url_for('job_seeker_dashboard'))
@@ -565,7 +862,7 @@ def profile():
     if 'user_id' not in session or session.get('role') != 'job_seeker':
         return redirect(url_for('login'))
     
-    user = mongo.db.users.find_one({'_id': session['user_id']})
+    user = get_session_user()
     
     if request.method == 'POST':
         # Update user profile information
@@ -576,20 +873,25 @@ def profile():
         skills = request.form.get('skills', '')
         
         # Update user document
-        mongo.db.users.update_one(
-            {'_id': session['user_id']},
-            {
-                '$set': {
-                    'name': name,
-                    'email': email,
-                    'profile': {
-                        'education': education,
-                        'experience': experience,
-                        'skills': skills
+        try:
+            mongo.db.users.update_one(
+                {'_id': session['user_id']},
+                {
+                    '$set': {
+                        'name': name,
+                        'email': email,
+                        'profile': {
+                            'education': education,
+                            'experience': experience,
+                            'skills': skills
+                        }
                     }
                 }
-            }
-        )
+            )
+        except DuplicateKeyError:
+            flash('User with this email already exists!')
+            return redirect(url_for('profile'))
+        user_changed(session['user_id'])
         
         flash('Profile updated successfully!')
         return redirect(url_for('profile'))
@@ -614,14 +916,22 @@ def upload_resume():
     if file and allowed_file(file.filename):
         filename = secure_filename(file.filename)
         
-        # Store file in GridFS
-        file_id = fs.put(file, filename=filename, user_id=session['user_id'])
+        # Store file in GridFS, sharing an identical file if one is already stored
+        try:
+            file_id = store_resume(mongo.db, fs, file.stream, filename, app.config['MAX_RESUME_BYTES'])
+        except ResumeTooLarge:
+            flash(f"Resume is too large (maximum {app.config['MAX_RESUME_BYTES'] // (1024 * 1024)} MB)")
+            return redirect(url_for('profile'))
         
-        # Update user document with resume file ID
-        mongo.db.users.update_one(
+        # Update user document with resume file ID and release the previous resume
+        previous = mongo.db.users.find_one_and_update(
             {'_id': session['user_id']},
-            {'$set': {'resume_id': file_id, 'resume_filename': filename}}
+            {'$set': {'resume_id': file_id, 'resume_filename': filename}},
+            projection={'resume_id': 1}
         )
+        user_changed(session['user_id'])
+        if previous:
+            release_resume(mongo.db, previous.get('resume_id'))
         
         flash('Resume uploaded successfully!')
         return redirect(url_for('profile'))
@@ -644,8 +954,8 @@ def download_resume(user_id):
         return redirect(url_for('index'))
     
     # Check if user is admin, employer viewing applicant's resume, or job_seeker viewing own resume
-    current_user = mongo.db.users.find_one({'_id': session['user_id']})
-    target_user = mongo.db.users.find_one({'_id': user_object_id})
+    current_user = get_session_user()
+    target_user = get_user(user_object_id)
     
     if not target_user:
         flash('User not found')
@@ -673,14 +983,11 @@ def download_resume(user_id):
             return redirect(url_for('index'))
     
     try:
-        # Get file from GridFS
+        # Get file from GridFS and stream it chunk by chunk
         grid_out = fs.get(target_user['resume_id'])
-        return send_file(
-            BytesIO(grid_out.read()),
-            download_name=target_user.get('resume_filename', 'resume'),
-            as_attachment=True
-        )
-    except Exception as e:
+        return gridfs_download_response(grid_out, target_user.get('resume_filename', 'resume'))
+    except NoFile:
+        # Only a missing file is handled here; HTTP errors such as an unsatisfiable Range propagate
         flash('Error downloading resume')
         if current_user['role'] == 'employer':
             return redirect(url_for('employer_dashboard'))
@@ -701,32 +1008,106 @@ def update_application_status():
     
     new_status = request.form['status']
     
-    # Update application status
-    mongo.db.applications.update_one(
+    # Update application status, reading back the previous status for the rollups
+    application = mongo.db.applications.find_one_and_update(
         {'_id': application_id},
         {'$set': {'status': new_status}}
     )
     
-    # Send email notification to job seeker
-    application = mongo.db.applications.find_one({'_id': application_id})
     if application:
-        job_seeker = mongo.db.users.find_one({'_id': application['job_seeker_id']})
+        # Status counts changed; move the rollup counters and let the admin charts re-render
+        record_status_change(mongo.db, application.get('status'), new_status)
+        touch_data_version(mongo.db)
+        
+        # Send email notification to job seeker
+        job_seeker = get_user(application['job_seeker_id'])
         job = mongo.db.job_posts.find_one({'_id': application['job_id']})
+        publish_status_change(application, job, new_status)
         
         if job_seeker and job:
-            subject = f"Application Status Update for {job['title']}"
-            if new_status == 'Accepted':
-                body = f"Dear {job_seeker['name']},\n\nGood news! Your application for the position \"{job['title']}\" has been ACCEPTED by the employer.\n\nWe congratulate you and wish you success in your new role!\n\nBest regards,\nJob Portal Team"
-            elif new_status == 'Rejected':
-                body = f"Dear {job_seeker['name']},\n\nWe regret to inform you that your application for the position \"{job['title']}\" has been REJECTED by the employer.\n\nWe encourage you to keep applying to other opportunities on our platform.\n\nBest regards,\nJob Portal Team"
-            else:
-                body = f"Dear {job_seeker['name']},\n\nYour application status for the position \"{job['title']}\" has been updated to: {new_status}\n\nApplication Date: {application['date_applied'].strftime('%Y-%m-%d %H:%M:%S')}\n\nBest regards,\nJob Portal Team"
-            
+            subject, body = application_status_email(job_seeker, job, application, new_status)
             send_email(job_seeker['email'], subject, body)
     
     flash('Application status updated successfully!')
     return redirect(url_for('employer_dashboard'))
 
+@app.route('/update_application_status/bulk', methods=['POST'])
+def bulk_update_application_status():
+    if 'user_id' not in session or session.get('role') != 'employer':
+        return redirect(url_for('login'))
+    
+    # JSON clients get a JSON answer; the dashboard form gets a flash message
+    data = request.get_json(silent=True)
+    wants_json = isinstance(data, dict)
+    if not wants_json:
+        data = {'application_ids': request.form.getlist('application_ids'), 'status': request.form.get('status', '')}
+    
+    from bson import ObjectId
+    try:
+        application_ids = list(dict.fromkeys(ObjectId(i) for i in data.get('application_ids') or []))
+    except:
+        return bulk_status_response(wants_json, 'Invalid application ID', 400)
+    new_status = str(data.get('status') or '').strip()
+    if not application_ids or not new_status:
+        return bulk_status_response(wants_json, 'Select applications and a status', 400)
+    if len(application_ids) > app.config['BULK_STATUS_MAX']:
+        return bulk_status_response(wants_json, f"At most {app.config['BULK_STATUS_MAX']} applications per update", 400)
+    
+    # One query resolves the applications with their jobs and checks the employer owns every one
+    owned = list(mongo.db.applications.aggregate([
+        {'$match': {'_id': {'$in': application_ids}}},
+        {'$lookup': {'from': 'job_posts', 'localField': 'job_id', 'foreignField': '_id', 'as': 'job'}},
+        {'$unwind': '$job'},
+        {'$match': {'job.employer_id': session['user_id']}},
+        {'$project': {'job_id': 1, 'job_seeker_id': 1, 'status': 1, 'date_applied': 1, 'job.title': 1}}
+    ]))
+    if len(owned) != len(application_ids):
+        return bulk_status_response(wants_json, 'Some applications were not found for your jobs', 403)
+    
+    changed = [application for application in owned if application.get('status') != new_status]
+    if changed:
+        # Each update is guarded by the status it was read with, matching the rollup deltas below;
+        # the change id tells which updates this request applied if another one got in first
+        change_id = ObjectId()
+        result = mongo.db.applications.bulk_write([
+            UpdateOne(
+                {'_id': application['_id'], 'status': application.get('status')},
+                {'$set': {'status': new_status, 'status_change_id': change_id}}
+            )
+            for application in changed
+        ], ordered=False)
+        if result.modified_count != len(changed):
+            applied = {doc['_id'] for doc in mongo.db.applications.find(
+                {'_id': {'$in': [application['_id'] for application in changed]}, 'status_change_id': change_id},
+                {'_id': 1}
+            )}
+            changed = [application for application in changed if application['_id'] in applied]
+    if changed:
+        record_status_changes(mongo.db, [(application.get('status'), new_status) for application in changed])
+        touch_data_version(mongo.db)
+        for application in changed:
+            publish_status_change(application, application['job'], new_status)
+        
+        # Notify every job seeker, loading them in one query and queueing the emails in one write
+        job_seekers = request_loader(mongo.db.users, {'name': 1, 'email': 1}).load_many(
+            [application['job_seeker_id'] for application in changed]
+        )
+        messages = []
+        for application in changed:
+            job_seeker = job_seekers.get(application['job_seeker_id'])
+            if job_seeker:
+                subject, body = application_status_email(job_seeker, application['job'], application, new_status)
+                messages.append((job_seeker['email'], subject, body))
+        send_emails(messages)
+    
+    return bulk_status_response(wants_json, f'{len(changed)} application(s) updated to {new_status}', updated=len(changed))
+
+def bulk_status_response(wants_json, message, status_code=200, **extra):
+    if wants_json:
+        return jsonify({'message': message, **extra}), status_code
+    flash(message)
+    return redirect(url_for('employer_dashboard'))
+
 @app.route('/view_applicant/<application_id>')
 def view_applicant(application_id):
     if 'user_id' not in session or session.get('role') != 'employer':
@@ -744,7 +1125,7 @@ def view_applicant(application_id):
         flash('Application not found')
         return redirect(url_for('employer_dashboard'))
     
-    job_seeker = mongo.db.users.find_one({'_id': application['job_seeker_id']})
+    job_seeker = get_user(application['job_seeker_id'])
     if not job_seeker:
         flash('Job seeker not found')
         return redirect(url_for('employer_dashboard'))
@@ -760,5 +1141,131 @@ def view_applicant(application_id):
                           job_seeker=job_seeker, 
                           job=job)
 
+@app.cli.command('create-indexes')
+def create_indexes_command():
+    """Create the registered indexes on every collection"""
+    failures = 0
+    for collection_name, result in ensure_indexes(mongo.db).items():
+        print(f"{collection_name}: {', '.join(result['created']) or 'none created'}")
+        for name, error in result['failed'].items():
+            print(f"  FAILED {name}: {error}")
+        failures += len(result['failed'])
+    if failures:
+        raise SystemExit(1)
+
+@app.cli.command('index-advisor')
+def index_advisor_command():
+    """Explain each route's canonical queries and report collection scans"""
+    collscans = 0
+    for row in advise(mongo.db):
+        status = 'COLLSCAN' if row['collscan'] else 'ok'
+        print(f"[{status}] {row['route']}: {row['collection']}.find({row['query']}) -> {' > '.join(row['stages'])}")
+        collscans += row['collscan']
+    print(f"{collscans} quer{'y' if collscans == 1 else 'ies'} scanning a whole collection")
+    if collscans:
+        raise SystemExit(1)
+
+@app.cli.command('outbox-worker')
+@click.option('--workers', default=2, show_default=True, help='Number of SMTP worker threads.')
+@click.option('--once', is_flag=True, help='Send everything currently due, then exit.')
+def outbox_worker_command(workers, once):
+    """Deliver queued emails from the outbox"""
+    pool = create_outbox_pool(workers)
+    if once:
+        print(f"Processed {pool.drain()} message(s)")
+        return
+    pool.start()
+    print(f"Outbox worker running with {workers} thread(s); press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pool.stop()
+
+@app.cli.command('outbox-status')
+def outbox_status_command():
+    """Show how many outbox messages are in each status"""
+    for status, count in sorted(outbox_status(mongo.db).items()):
+        print(f"{status}: {count}")
+
+@app.cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Recompute the analytics rollups from the source collections"""
+    for name, size in rebuild_rollups(mongo.db).items():
+        print(f"{name}: {size} document(s)")
+
+@app.cli.command('check-rollups')
+def check_rollups_command():
+    """Verify the analytics rollups against the source collections"""
+    mismatches = check_rollups(mongo.db)
+    for mismatch in mismatches:
+        print(f"{mismatch['rollup']}[{mismatch['key']}]: expected {mismatch['expected']}, found {mismatch['actual']}")
+    print(f"{len(mismatches)} mismatch(es)")
+    if mismatches:
+        raise SystemExit(1)
+
+@app.cli.command('gc-resumes')
+@click.option('--dry-run', is_flag=True, help='Only report the files that would be removed.')
+@click.option('--grace-hours', default=1.0, show_default=True, help='Skip files uploaded more recently than this.')
+def gc_resumes_command(dry_run, grace_hours):
+    """Remove stored resumes that no user references"""
+    orphans = collect_garbage(mongo.db, dry_run=dry_run, grace_seconds=grace_hours * 3600)
+    for doc in orphans:
+        print(f"{doc['_id']} {doc.get('filename')} {doc.get('length', 0)} bytes, uploaded {doc.get('uploadDate')}")
+    total = sum(doc.get('length', 0) for doc in orphans)
+    print(f"{'Would remove' if dry_run else 'Removed'} {len(orphans)} file(s), {total} bytes")
+
+@app.cli.command('import-jobs')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--employer', 'employer_email', required=True, help='Email of the employer the jobs are posted for.')
+@click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS), help='Defaults to the file extension.')
+@click.option('--batch-size', default=None, type=int, help='Jobs per insert_many batch.')
+def import_jobs_command(path, employer_email, fmt, batch_size):
+    """Import job posts from a CSV or NDJSON file"""
+    employer = mongo.db.users.find_one({'email': employer_email, 'role': 'employer'}, {'_id': 1})
+    if not employer:
+        raise click.ClickException(f"No employer with email {employer_email}")
+    fmt = fmt or detect_format(path)
+    if not fmt:
+        raise click.ClickException('Cannot tell the format from the file name; pass --format')
+    
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        report = import_jobs(mongo.db, f, fmt, employer['_id'],
+                             batch_size=batch_size or app.config['JOB_IMPORT_BATCH_SIZE'])
+    for error in report['errors']:
+        print(f"Row {error['row']}: {error['error']}")
+    if report.get('aborted'):
+        print(report['aborted'])
+    print(f"Imported {report['inserted']} job(s), {report['failed']} row(s) failed, "
+          f"in {time.perf_counter() - started:.1f} s")
+    if report['failed'] or report.get('aborted'):
+        raise SystemExit(1)
+
+@app.cli.command('export-applications')
+@click.argument('path', type=click.Path(dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), help='Defaults to the file extension, else csv.')
+@click.option('--since', help='First application date to include (YYYY-MM-DD).')
+@click.option('--until', help='Last application date to include (YYYY-MM-DD).')
+@click.option('--batch-size', default=None, type=int, help='Applications joined per batch.')
+def export_applications_command(path, fmt, since, until, batch_size):
+    """Export applications with their job and job seeker to a file, or - for stdout"""
+    fmt = fmt or next((f for f in EXPORT_FORMATS if path.lower().endswith(f'.{f}')), 'csv')
+    if fmt == 'parquet' and not parquet_available():
+        raise click.ClickException('Parquet export needs pyarrow installed')
+    try:
+        query = parse_date_range(since, until)
+    except ValueError:
+        raise click.ClickException('Dates must be YYYY-MM-DD')
+    
+    started = time.perf_counter()
+    size = 0
+    with click.open_file(path, 'wb') as f:
+        for chunk in export_applications(mongo.db, fmt, query, batch_size or app.config['EXPORT_BATCH_SIZE']):
+            f.write(chunk)
+            size += len(chunk)
+    if path != '-':
+        print(f"Wrote {size} bytes to {path} in {time.perf_counter() - started:.1f} s")
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""Cold-start benchmark: import time and memory of a freshly started app process.
+
+Each run starts a new interpreter with ``-X importtime``, imports ``app`` and
+reports the total import time, the slowest top-level imports, the resident
+memory after startup and whether the plotting stack was loaded. Runs with
+PRELOAD_PLOTTING off and on are compared by default.
+
+Startup talks to MongoDB (MONGO_URI), so point it at a local mongod.
+
+    python benchmarks/cold_start.py --runs 5 --json cold_start.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'seaborn')
+
+# Runs inside the child interpreter after startup
+PROBE = """
+import json, resource, sys
+import app
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss_kb //= 1024
+print(json.dumps({
+    'max_rss_mb': rss_kb / 1024,
+    'loaded': [name for name in %r if name in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """Return (total microseconds, [(cumulative us, module)] for top-level imports)"""
+    top_level = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            top_level.append((int(match.group(2)), match.group(4)))
+    return sum(us for us, _ in top_level), sorted(top_level, reverse=True)
+
+
+def run_once(preload):
+    env = dict(os.environ)
+    env.update({
+        'PRELOAD_PLOTTING': 'True' if preload else 'False',
+        'OUTBOX_WORKERS': '0',
+        'CREATE_INDEXES_ON_STARTUP': 'False'
+    })
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    total_us, top_level = parse_importtime(result.stderr)
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        'import_ms': total_us / 1000,
+        'max_rss_mb': probe['max_rss_mb'],
+        'loaded': probe['loaded'],
+        'slowest': [{'module': name, 'ms': us / 1000} for us, name in top_level[:10]]
+    }
+
+
+def summarize(runs):
+    return {
+        'import_ms_median': statistics.median(run['import_ms'] for run in runs),
+        'max_rss_mb_median': statistics.median(run['max_rss_mb'] for run in runs),
+        'loaded': runs[-1]['loaded'],
+        'slowest': runs[-1]['slowest']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='processes started per configuration')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for label, preload in (('lazy', False), ('preload', True)):
+        results[label] = summarize([run_once(preload) for _ in range(args.runs)])
+        summary = results[label]
+        print(f"{label:8} import {summary['import_ms_median']:8.1f} ms  "
+              f"rss {summary['max_rss_mb_median']:7.1f} MB  "
+              f"loaded: {', '.join(summary['loaded']) or 'none'}")
+        for row in summary['slowest'][:5]:
+            print(f"           {row['ms']:8.1f} ms  {row['module']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Recommendation benchmark: profile scoring latency over a large job index.
+
+Generates synthetic job postings in memory with the seeder's vocabulary,
+builds the hashed TF-IDF index from them and times recommendations for
+random seeker profiles. Each timing covers the profile vector, the
+matrix-vector product and the top-k selection. No database is involved.
+
+    python benchmarks/job_recommendations.py --jobs 500000 --queries 200
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bson import ObjectId
+
+from recommendations import JobRecommender, job_vector
+from seed import CATEGORIES, ROLES, SENIORITY, SKILLS
+
+
+def synthetic_jobs(count, rng):
+    for _ in range(count):
+        category = rng.choice(CATEGORIES)
+        title = f'{rng.choice(SENIORITY)} {rng.choice(ROLES[category])}'
+        skills = rng.sample(SKILLS, rng.randint(3, 6))
+        yield {
+            '_id': ObjectId(),
+            'title': title,
+            'requirements': ', '.join(skills),
+            'description': f'We are hiring a {title} to join our {category.lower()} team. '
+                           f'You will work with {", ".join(skills[:3])} on day-to-day projects.'
+        }
+
+
+def synthetic_profile(rng):
+    return {
+        'skills': ', '.join(rng.sample(SKILLS, rng.randint(3, 8))),
+        'experience': f'{rng.randint(0, 15)} years as {rng.choice(ROLES[rng.choice(CATEGORIES)])}',
+        'education': rng.choice(['B.E.', 'B.Tech', 'B.Sc', 'MBA', 'M.Tech', 'B.Com'])
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time job recommendations over a synthetic index.')
+    parser.add_argument('--jobs', type=int, default=500000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--random-seed', type=int, default=42)
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    rng = random.Random(args.random_seed)
+    started = time.perf_counter()
+    job_ids, vectors = [], []
+    for job in synthetic_jobs(args.jobs, rng):
+        job_ids.append(job['_id'])
+        vectors.append(job_vector(job))
+    vectorize_s = time.perf_counter() - started
+
+    recommender = JobRecommender(db=None, refresh_seconds=float('inf'))
+    started = time.perf_counter()
+    recommender.load(job_ids, vectors)
+    build_s = time.perf_counter() - started
+    entries = recommender.stats()['entries']
+    print(f'{args.jobs} jobs vectorized in {vectorize_s:.1f} s, index built in {build_s:.1f} s, {entries} entries')
+
+    profiles = [synthetic_profile(rng) for _ in range(args.queries)]
+    recommender.recommend(profiles[0], args.k)  # warm up
+    latencies = []
+    for profile in profiles:
+        started = time.perf_counter()
+        recommender.recommend(profile, args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    results = {
+        'jobs': args.jobs,
+        'entries': entries,
+        'vectorize_s': vectorize_s,
+        'build_s': build_s,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'mean_ms': statistics.fmean(latencies)
+    }
+    print(f"recommend k={args.k}: p50 {results['p50_ms']:.2f} ms  p95 {results['p95_ms']:.2f} ms  "
+          f"p99 {results['p99_ms']:.2f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Password hashing micro-benchmark: login throughput per core.
+
+For each hash method, measures the latency of one verification and the
+throughput of PasswordHasher at several worker counts. Each worker count is
+driven by four times as many concurrent "login" threads. Throughput per
+worker is the number to size PASSWORD_HASH_WORKERS with: expected login rate
+divided by it gives the cores needed. No database is involved.
+
+    python benchmarks/password_hashing.py
+    python benchmarks/password_hashing.py --method pbkdf2:sha256:600000 --workers 1 2 4 --json hashing.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from passwords import PasswordHasher
+
+DEFAULT_METHODS = ['scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000']
+
+
+def single_latency(stored_hash, samples):
+    """Median milliseconds of one verification on the calling thread"""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        check_password_hash(stored_hash, 'password')
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def throughput(method, stored_hash, workers, duration):
+    """Verifications per second through a PasswordHasher with the given workers"""
+    hasher = PasswordHasher(method, workers=workers, queue_size=workers * 4)
+    deadline = time.perf_counter() + duration
+    counts = []
+
+    def client():
+        done = 0
+        while time.perf_counter() < deadline:
+            hasher.verify(stored_hash, 'password')
+            done += 1
+        counts.append(done)
+
+    threads = [threading.Thread(target=client) for _ in range(workers * 4)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+    return sum(counts) / elapsed
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='Measure password verification throughput per core.')
+    parser.add_argument('--method', action='append', help='werkzeug hash method; repeat to compare several')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, max(1, cores // 2), cores}))
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per throughput measurement')
+    parser.add_argument('--samples', type=int, default=20, help='verifications timed for the latency')
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = {'cores': cores, 'methods': {}}
+    for method in args.method or DEFAULT_METHODS:
+        stored_hash = generate_password_hash('password', method=method)
+        latency = single_latency(stored_hash, args.samples)
+        entry = {'latency_ms': latency, 'throughput': {}}
+        print(f'{method}: {latency:.1f} ms per verification, {1000 / latency:.1f} logins/s on one core')
+        for workers in args.workers:
+            rate = throughput(method, stored_hash, workers, args.duration)
+            entry['throughput'][workers] = {'logins_per_s': rate, 'logins_per_s_per_worker': rate / workers}
+            print(f'  {workers:3} worker(s): {rate:8.1f} logins/s, {rate / workers:7.1f} per worker')
+        results['methods'][method] = entry
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
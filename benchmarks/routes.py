@@ -0,0 +1,264 @@
+"""Route-level latency benchmark built on the Flask test client.
+
+Seeds a synthetic data set (see seed.py), then drives the hot routes as
+logged-in users and reports p50/p95/p99 latency, MongoDB commands per request
+and peak Python memory per request for each route. Results are saved as JSON
+and can be compared against a previous run to catch regressions.
+
+    python benchmarks/routes.py --scale 1k --json results.json
+    python benchmarks/routes.py --scale 1k --compare results.json
+    python benchmarks/routes.py --mongomock --scale 1k   # no mongod needed
+
+mongomock supports neither $text nor $dateTrunc, so under --mongomock the
+text-search case is skipped and analytics aggregate live instead of reading
+rollups. It also emits no command events, so queries per request read 0. Use
+it for relative comparisons, not absolute numbers.
+
+Against a real mongod, the target database (MONGO_URI) is dropped and reseeded
+unless --no-seed is given.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from pymongo import monitoring
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts the MongoDB commands a request issues while it is measured
+
+    Listeners hear every thread's commands, including the app's background
+    threads (log tails, refreshes, the outbox), so only commands started on
+    the thread that last called reset() are counted.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._thread = None
+
+    def reset(self):
+        """Start counting from zero for requests made on the calling thread"""
+        self.count = 0
+        self._thread = threading.get_ident()
+
+    def started(self, event):
+        if threading.get_ident() == self._thread:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def load_app(use_mongomock):
+    """Import the app, optionally backed by an in-memory mongomock server"""
+    os.environ.setdefault('OUTBOX_WORKERS', '0')
+    if use_mongomock:
+        import mongomock
+        import mongomock.gridfs
+        import pymongo
+        import flask_pymongo
+        defaults = {
+            'SECRET_KEY': 'benchmark',
+            'MONGO_URI': 'mongodb://localhost:27017/job_portal_benchmark',
+            'MAIL_SERVER': 'localhost',
+            'MAIL_PORT': '25',
+            'PLOTS_FOLDER': os.path.join(ROOT, 'static', 'plots'),
+            'ALLOWED_EXTENSIONS': 'pdf,doc,docx'
+        }
+        for key, value in defaults.items():
+            os.environ.setdefault(key, value)
+        pymongo.MongoClient = mongomock.MongoClient
+        flask_pymongo.MongoClient = mongomock.MongoClient
+        mongomock.gridfs.enable_gridfs_integration()
+        # mongomock has no aggregation expressions in find() projections
+        import search
+        search.JOB_CARD_PROJECTION['description'] = 1
+    import app
+    app.app.config['TESTING'] = True
+    return app
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def login(client, user_id, role):
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['role'] = role
+
+
+def route_cases(ids, rng):
+    """(name, role, user picker, request maker) for every benchmarked route"""
+    def seeker():
+        return rng.choice(ids['seeker_ids'])
+
+    def employer():
+        return rng.choice(ids['employer_ids'])
+
+    def admin():
+        return ids['admin_id']
+
+    categories = ['Software Development', 'Data Science', 'Marketing', 'Finance']
+    return [
+        ('job_seeker_dashboard', 'job_seeker', seeker,
+         lambda client: client.get('/job_seeker/dashboard')),
+        ('job_seeker_dashboard?category', 'job_seeker', seeker,
+         lambda client: client.get('/job_seeker/dashboard', query_string={'category': rng.choice(categories)})),
+        ('job_seeker_dashboard?search', 'job_seeker', seeker,
+         lambda client: client.get('/job_seeker/dashboard', query_string={'search': rng.choice(['python', 'senior engineer', 'analyst'])})),
+        ('employer_dashboard', 'employer', employer,
+         lambda client: client.get('/employer/dashboard')),
+        ('apply_job', 'job_seeker', seeker,
+         lambda client: client.post(f"/apply_job/{rng.choice(ids['job_ids'])}")),
+        ('admin_analytics', 'admin', admin,
+         lambda client: client.get('/admin/analytics'))
+    ]
+
+
+def bench_route(client, counter, role, pick_user, make_request, iterations, warmup, memory_samples=20):
+    latencies, queries, errors = [], [], 0
+    for i in range(warmup + iterations):
+        login(client, pick_user(), role)
+        counter.reset()
+        started = time.perf_counter()
+        response = make_request(client)
+        elapsed = time.perf_counter() - started
+        if i < warmup:
+            continue
+        if response.status_code >= 500:
+            errors += 1
+        latencies.append(elapsed * 1000)
+        queries.append(counter.count)
+
+    # tracemalloc slows every allocation down, so memory is sampled in a separate pass
+    peaks = []
+    for _ in range(min(memory_samples, iterations)):
+        login(client, pick_user(), role)
+        tracemalloc.start()
+        make_request(client)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'mean_ms': statistics.fmean(latencies),
+        'queries_per_request': statistics.fmean(queries),
+        'peak_memory_kb': max(peaks) if peaks else 0.0
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print per-route changes against a baseline run, returning the regressed routes"""
+    regressions = []
+    for name, current in results['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if not previous:
+            continue
+        for metric in ('p95_ms', 'queries_per_request', 'peak_memory_kb'):
+            before, after = previous[metric], current[metric]
+            change = (after - before) / before if before else 0.0
+            flag = ''
+            if change > threshold:
+                flag = '  REGRESSION'
+                regressions.append((name, metric))
+            print(f'{name:32} {metric:20} {before:10.2f} -> {after:10.2f} ({change:+.0%}){flag}')
+    return regressions
+
+
+def main():
+    from seed import SCALES, seed
+
+    parser = argparse.ArgumentParser(description='Benchmark route latency against a seeded database.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--mongomock', action='store_true', help='run against in-memory mongomock instead of mongod')
+    parser.add_argument('--no-seed', action='store_true', help='reuse the data already in the database')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='compare against a previous results file')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative change reported as a regression')
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    monitoring.register(counter)
+    portal = load_app(args.mongomock)
+    db = portal.mongo.db
+
+    from indexes import ensure_indexes
+    from rollups import rebuild_rollups
+
+    if args.no_seed:
+        ids = {
+            'admin_id': db.users.find_one({'role': 'admin'}, {'_id': 1})['_id'],
+            'employer_ids': [u['_id'] for u in db.users.find({'role': 'employer'}, {'_id': 1}).limit(1000)],
+            'seeker_ids': [u['_id'] for u in db.users.find({'role': 'job_seeker'}, {'_id': 1}).limit(1000)],
+            'job_ids': [j['_id'] for j in db.job_posts.find({}, {'_id': 1}).limit(10000)]
+        }
+    else:
+        for name in ('users', 'job_posts', 'applications', 'fs.files', 'fs.chunks'):
+            db.drop_collection(name)
+        ensure_indexes(db)
+        started = time.perf_counter()
+        ids = seed(db, portal.fs, **SCALES[args.scale])
+        try:
+            rebuild_rollups(db)
+        except Exception as e:
+            print(f'Could not build rollups ({e}); analytics will aggregate live')
+        print(f'Seeded {args.scale} in {time.perf_counter() - started:.1f} s')
+
+    rng = random.Random(7)
+    client = portal.app.test_client()
+    results = {
+        'meta': {
+            'scale': args.scale,
+            'backend': 'mongomock' if args.mongomock else 'mongod',
+            'iterations': args.iterations,
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version()
+        },
+        'routes': {}
+    }
+    for name, role, pick_user, make_request in route_cases(ids, rng):
+        if args.mongomock and name.endswith('?search'):
+            continue
+        stats = bench_route(client, counter, role, pick_user, make_request, args.iterations, args.warmup)
+        results['routes'][name] = stats
+        print(f"{name:32} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  "
+              f"queries {stats['queries_per_request']:6.1f}  peak {stats['peak_memory_kb']:9.1f} KB"
+              + (f"  errors {stats['errors']}" if stats['errors'] else ''))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""Synthetic data generator for benchmarks.
+
+Seeds users (job seekers with profiles, employers and an admin), job posts
+with varied categories, locations and salaries, applications and GridFS
+resumes, at a named scale or with explicit counts. Every seeded user's
+password is ``password``.
+
+    python benchmarks/seed.py --scale 100k --drop
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from werkzeug.security import generate_password_hash
+
+SCALES = {
+    '1k': {'users': 1000, 'jobs': 1000, 'applications': 5000, 'resumes': 200},
+    '100k': {'users': 20000, 'jobs': 100000, 'applications': 100000, 'resumes': 2000},
+    '1m': {'users': 200000, 'jobs': 1000000, 'applications': 1000000, 'resumes': 5000}
+}
+
+CATEGORIES = [
+    'Software Development', 'Data Science', 'Design', 'Marketing', 'Sales', 'Finance',
+    'Human Resources', 'Operations', 'Customer Support', 'Healthcare', 'Education', 'Legal'
+]
+LOCATIONS = [
+    'Pune', 'Mumbai', 'Bengaluru', 'Hyderabad', 'Chennai', 'Delhi', 'Noida', 'Gurugram',
+    'Kolkata', 'Ahmedabad', 'Jaipur', 'Remote'
+]
+SENIORITY = ['Junior', 'Associate', 'Senior', 'Lead', 'Principal']
+ROLES = {
+    'Software Development': ['Backend Engineer', 'Frontend Developer', 'Python Developer', 'Java Developer', 'DevOps Engineer'],
+    'Data Science': ['Data Scientist', 'Data Analyst', 'ML Engineer', 'Data Engineer'],
+    'Design': ['UI Designer', 'UX Researcher', 'Product Designer', 'Graphic Designer'],
+    'Marketing': ['Content Writer', 'SEO Specialist', 'Growth Marketer', 'Brand Manager'],
+    'Sales': ['Account Executive', 'Sales Manager', 'Business Development Rep'],
+    'Finance': ['Accountant', 'Financial Analyst', 'Auditor'],
+    'Human Resources': ['Recruiter', 'HR Generalist', 'Talent Partner'],
+    'Operations': ['Operations Manager', 'Supply Chain Analyst', 'Project Coordinator'],
+    'Customer Support': ['Support Engineer', 'Customer Success Manager'],
+    'Healthcare': ['Staff Nurse', 'Medical Coder', 'Pharmacist'],
+    'Education': ['Math Teacher', 'Instructional Designer', 'Academic Counsellor'],
+    'Legal': ['Legal Associate', 'Compliance Officer']
+}
+SKILLS = [
+    'python', 'java', 'javascript', 'react', 'sql', 'mongodb', 'flask', 'django', 'aws', 'docker',
+    'kubernetes', 'excel', 'tableau', 'figma', 'seo', 'communication', 'negotiation', 'accounting',
+    'recruiting', 'machine learning', 'statistics', 'leadership', 'project management', 'linux'
+]
+STATUSES = ['Pending', 'Reviewed', 'Accepted', 'Rejected']
+STATUS_WEIGHTS = [55, 20, 8, 17]
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(collection, docs, batch_size):
+    for batch in _batches(docs, batch_size):
+        collection.insert_many(batch, ordered=False)
+
+
+def seed_resumes(db, fs, count, rng):
+    """Store small PDF-like resumes in GridFS the way upload_resume does, returning their ids"""
+    file_ids = []
+    for i in range(count):
+        data = b'%PDF-1.4\n' + rng.randbytes(rng.randint(20, 200) * 1024)
+        file_id = fs.put(data, filename=f'resume_{i}.pdf', refcount=0)
+        db.fs.files.update_one({'_id': file_id}, {'$set': {'sha256': hashlib.sha256(data).hexdigest()}})
+        file_ids.append(file_id)
+    return file_ids
+
+
+def seed(db, fs, users, jobs, applications, resumes, random_seed=42, batch_size=1000, now=None):
+    """Insert a synthetic data set, returning the ids benchmarks need to log in as users"""
+    rng = random.Random(random_seed)
+    now = now or datetime.utcnow()
+    password = generate_password_hash('password')
+
+    resume_ids = seed_resumes(db, fs, resumes, rng)
+
+    # Users: one admin, ~10% employers, the rest job seekers with complete profiles
+    admin_id = ObjectId()
+    employer_ids = [ObjectId() for _ in range(max(1, users // 10))]
+    seeker_ids = [ObjectId() for _ in range(max(1, users - len(employer_ids) - 1))]
+    resume_refs = {}
+
+    def user_docs():
+        yield {'_id': admin_id, 'name': 'Admin', 'email': 'admin@example.com', 'password': password, 'role': 'admin'}
+        for i, employer_id in enumerate(employer_ids):
+            yield {'_id': employer_id, 'name': f'Employer {i}', 'email': f'employer{i}@example.com',
+                   'password': password, 'role': 'employer'}
+        for i, seeker_id in enumerate(seeker_ids):
+            doc = {
+                '_id': seeker_id,
+                'name': f'Job Seeker {i}',
+                'email': f'seeker{i}@example.com',
+                'password': password,
+                'role': 'job_seeker',
+                'profile': {
+                    'education': rng.choice(['B.E.', 'B.Tech', 'B.Sc', 'MBA', 'M.Tech', 'B.Com']),
+                    'experience': f'{rng.randint(0, 15)} years',
+                    'skills': ', '.join(rng.sample(SKILLS, rng.randint(3, 8)))
+                }
+            }
+            if resume_ids:
+                resume_id = rng.choice(resume_ids)
+                resume_refs[resume_id] = resume_refs.get(resume_id, 0) + 1
+                doc['resume_id'] = resume_id
+                doc['resume_filename'] = 'resume.pdf'
+            yield doc
+
+    _insert(db.users, user_docs(), batch_size)
+    for resume_id, refs in resume_refs.items():
+        db.fs.files.update_one({'_id': resume_id}, {'$set': {'refcount': refs}})
+
+    # Job posts spread over the last 180 days
+    job_ids = [ObjectId() for _ in range(jobs)]
+
+    def job_docs():
+        for job_id in job_ids:
+            category = rng.choice(CATEGORIES)
+            title = f'{rng.choice(SENIORITY)} {rng.choice(ROLES[category])}'
+            skills = rng.sample(SKILLS, rng.randint(3, 6))
+            employer = rng.randrange(len(employer_ids))
+            yield {
+                '_id': job_id,
+                'title': title,
+                'description': f'We are hiring a {title} to join our {category.lower()} team. '
+                               f'You will work with {", ".join(skills[:3])} on day-to-day projects.',
+                'requirements': ', '.join(skills),
+                'salary': float(round(rng.lognormvariate(13.2, 0.5), -3)),
+                'category': category,
+                'location': rng.choice(LOCATIONS),
+                'company_name': f'Company {employer}',
+                'company_address': f'{rng.randint(1, 500)} Business Park, {rng.choice(LOCATIONS)}',
+                'company_website': f'https://company{employer}.example.com',
+                'contact_person': f'Recruiter {employer}',
+                'contact_email': f'jobs@company{employer}.example.com',
+                'contact_phone': f'+91 9{rng.randint(100000000, 999999999)}',
+                'employer_id': employer_ids[employer],
+                'date_posted': now - timedelta(seconds=rng.randint(0, 180 * 24 * 3600))
+            }
+
+    _insert(db.job_posts, job_docs(), batch_size)
+
+    # Applications: unique (job, seeker) pairs over the last 90 days
+    def application_docs():
+        seen = set()
+        limit = min(applications, len(job_ids) * len(seeker_ids))
+        while len(seen) < limit:
+            pair = (rng.randrange(len(job_ids)), rng.randrange(len(seeker_ids)))
+            if pair in seen:
+                continue
+            seen.add(pair)
+            yield {
+                'job_id': job_ids[pair[0]],
+                'job_seeker_id': seeker_ids[pair[1]],
+                'status': rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+                'date_applied': now - timedelta(seconds=rng.randint(0, 90 * 24 * 3600))
+            }
+
+    _insert(db.applications, application_docs(), batch_size)
+
+    return {'admin_id': admin_id, 'employer_ids': employer_ids, 'seeker_ids': seeker_ids, 'job_ids': job_ids}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed the portal database with synthetic data.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    for name in ('users', 'jobs', 'applications', 'resumes'):
+        parser.add_argument(f'--{name}', type=int, help=f'override the number of {name}')
+    parser.add_argument('--random-seed', type=int, default=42)
+    parser.add_argument('--drop', action='store_true', help='drop the portal collections first')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from app import fs, mongo
+    from indexes import ensure_indexes
+    from rollups import rebuild_rollups
+
+    counts = dict(SCALES[args.scale])
+    for name in counts:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+
+    if args.drop:
+        for name in ('users', 'job_posts', 'applications', 'fs.files', 'fs.chunks'):
+            mongo.db.drop_collection(name)
+    ensure_indexes(mongo.db)
+    seed(mongo.db, fs, random_seed=args.random_seed, **counts)
+    rebuild_rollups(mongo.db)
+    print(', '.join(f'{count} {name}' for name, count in counts.items()) + ' seeded')
+
+
+if __name__ == '__main__':
+    main()
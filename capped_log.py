@@ -0,0 +1,92 @@
+"""Capped collections tailed by every worker, for messages between processes.
+
+A writer inserts a small document; each worker tails the collection with a
+tailable cursor and handles the documents written after it started,
+keeping its place by insertion order rather than by _id, as _ids from
+different processes are not inserted in increasing order. The
+tail thread is started on first use in the process that uses it, not at
+import, so it runs in each worker forked from a preloading master and not
+in one-off CLI commands.
+"""
+import os
+import threading
+
+from pymongo import CursorType
+
+
+def ensure_capped_collection(db, name, size):
+    """Create a capped collection unless it exists; failures are reported, not raised"""
+    try:
+        if name not in db.list_collection_names():
+            db.create_collection(name, capped=True, size=size)
+    except Exception as e:
+        # Another worker may have created it first, or the server is not reachable yet
+        print(f"Error creating capped collection {name}: {str(e)}")
+
+
+class CappedTail:
+    """Background thread handing each new document of a capped collection to a callback"""
+
+    def __init__(self, db, name, size, on_document, on_interrupted=None, retry_interval=1.0):
+        self.db = db
+        self.name = name
+        self.size = size
+        self.collection = db[name]
+        self.on_document = on_document
+        # Called when the tail breaks off, as documents may have been missed until it resumes
+        self.on_interrupted = on_interrupted
+        self.retry_interval = retry_interval
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def ensure_started(self):
+        """Start tailing in this process unless already running; returns True when it just started"""
+        if self._pid == os.getpid():
+            return False
+        with self._lock:
+            if self._pid == os.getpid():
+                return False
+            # A thread started before a fork does not exist in the child, so each process starts its own
+            self._pid = os.getpid()
+            self._stop.clear()
+            # Created before anything is written to it, or the first insert would make a plain collection
+            ensure_capped_collection(self.db, self.name, self.size)
+            threading.Thread(target=self._run, name=f'tail-{self.name}', daemon=True).start()
+        return True
+
+    def stop(self):
+        """Stop tailing after the current wait"""
+        self._stop.set()
+
+    def _run(self):
+        last_id = None
+        started = False
+        while not self._stop.is_set():
+            try:
+                if started and last_id is not None and self.collection.find_one({'_id': last_id}, {'_id': 1}) is None:
+                    # The last document handled has been overwritten, so there is no telling what was missed
+                    started = False
+                    if self.on_interrupted:
+                        self.on_interrupted()
+                if not started:
+                    # Only documents written from now on matter to this process
+                    last = self.collection.find_one(sort=[('$natural', -1)])
+                    last_id = last['_id'] if last else None
+                    started = True
+                # _ids made by writers in other processes do not arrive in _id order, so the position is
+                # kept in insertion order: the tail reads from the oldest document and skips up to last_id
+                cursor = self.collection.find(cursor_type=CursorType.TAILABLE_AWAIT)
+                skipping = last_id is not None
+                while cursor.alive and not self._stop.is_set():
+                    for doc in cursor:
+                        if skipping:
+                            skipping = doc['_id'] != last_id
+                            continue
+                        last_id = doc['_id']
+                        self.on_document(doc)
+            except Exception as e:
+                print(f"Error tailing {self.name}: {str(e)}")
+                if self.on_interrupted:
+                    self.on_interrupted()
+            self._stop.wait(self.retry_interval)
@@ -0,0 +1,299 @@
+"""Admin chart rendering behind a data-versioned cache.
+
+Charts are rendered once per data version (collection counts plus the last
+analytics-relevant write) into versioned filenames, so workers never
+overwrite a file another worker is serving. Rendering happens on a
+background thread; requests are answered from the newest rendered version.
+matplotlib is imported on the first render (or by preload_plotting()), so
+workers that never render charts never pay for it.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import nullcontext
+
+
+from analytics import job_post_stats, salary_histogram
+from rollups import read_application_stats, read_category_stats
+
+VERSION_COLLECTION = 'data_versions'
+CHART_VERSIONS_KEPT = 2
+
+
+_pyplot = None
+_pyplot_lock = threading.Lock()
+# pyplot keeps the current figure in global state, so only one render may draw at a time
+_render_lock = threading.Lock()
+
+
+def pyplot():
+    """Import matplotlib's pyplot on first use, with the non-GUI Agg backend"""
+    global _pyplot
+    if _pyplot is None:
+        with _pyplot_lock:
+            if _pyplot is None:
+                # Set matplotlib backend to 'Agg' before importing pyplot to avoid GUI issues in web app
+                import matplotlib
+                matplotlib.use('Agg')
+                import matplotlib.pyplot
+                _pyplot = matplotlib.pyplot
+    return _pyplot
+
+
+def preload_plotting():
+    """Import the plotting stack now rather than on the first admin request"""
+    pyplot()
+
+
+def touch_data_version(db):
+    """Record a write that changes the charts without changing collection counts"""
+    db[VERSION_COLLECTION].update_one(
+        {'_id': 'analytics'},
+        {'$currentDate': {'updated_at': True}},
+        upsert=True
+    )
+
+
+def data_version(db):
+    """Stamp identifying the current state of the data behind the charts"""
+    counts = [db[name].estimated_document_count() for name in ('users', 'job_posts', 'applications')]
+    stamp = db[VERSION_COLLECTION].find_one({'_id': 'analytics'}) or {}
+    raw = f"{counts}|{stamp.get('updated_at')}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def _write_atomic(path, write):
+    """Write a file through a temporary sibling and rename it into place"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def save_figure(folder, name, version):
+    """Save and close the current figure as <name>.<version>.png, returning the filename"""
+    plt = pyplot()
+    filename = f'{name}.{version}.png'
+    _write_atomic(os.path.join(folder, filename), lambda f: plt.savefig(f, format='png'))
+    plt.close()
+    return filename
+
+
+def generate_admin_plots(db, folder, version):
+    """Generate admin dashboard visualizations, returning {plot name: filename}"""
+    plt = pyplot()
+    plots = {}
+    
+    # Aggregate everything server-side first; only the grouped results come back
+    try:
+        job_stats = job_post_stats(db)
+    except Exception as e:
+        print(f"Error aggregating job post stats: {str(e)}")
+        job_stats = {'salary_range': None, 'top_employers': []}
+    try:
+        application_counts = read_application_stats(db)
+    except Exception as e:
+        print(f"Error aggregating application stats: {str(e)}")
+        application_counts = {'statuses': [], 'per_day': []}
+    
+    # Bar Chart - Job count per category
+    try:
+        categories = [cat for cat in read_category_stats(db) if cat['_id'] is not None]
+        
+        if categories:
+            plt.figure(figsize=(10, 6))
+            plt.bar([str(cat['_id']) for cat in categories], [cat['count'] for cat in categories])
+            plt.title('Job Count per Category')
+            plt.xlabel('Category')
+            plt.ylabel('Count')
+            plt.xticks(rotation=45)
+            plt.tight_layout()
+            
+            plots['job_categories'] = save_figure(folder, 'job_categories', version)
+    except Exception as e:
+        print(f"Error generating job categories plot: {str(e)}")
+    
+    # Pie Chart - Application status distribution
+    try:
+        statuses = application_counts['statuses']
+        
+        if statuses:
+            plt.figure(figsize=(8, 6))
+            plt.pie([row['count'] for row in statuses], labels=[row['_id'] for row in statuses], autopct='%1.1f%%')
+            plt.title('Application Status Distribution')
+            plt.tight_layout()
+            
+            plots['application_status'] = save_figure(folder, 'application_status', version)
+    except Exception as e:
+        print(f"Error generating application status plot: {str(e)}")
+    
+    # Line Chart - Applications over time
+    try:
+        per_day = application_counts['per_day']
+        
+        if per_day:
+            plt.figure(figsize=(10, 6))
+            plt.plot([row['_id'].strftime('%Y-%m-%d') for row in per_day], [row['count'] for row in per_day], marker='o')
+            plt.title('Applications Over Time')
+            plt.xlabel('Date')
+            plt.ylabel('Number of Applications')
+            plt.xticks(rotation=45)
+            plt.tight_layout()
+            
+            plots['applications_over_time'] = save_figure(folder, 'applications_over_time', version)
+    except Exception as e:
+        print(f"Error generating applications over time plot: {str(e)}")
+    
+    # Histogram - Salary distribution
+    try:
+        if job_stats['salary_range']:
+            edges, counts = salary_histogram(db, job_stats['salary_range'])
+            
+            plt.figure(figsize=(10, 6))
+            plt.stairs(counts, edges, fill=True, edgecolor='black')
+            plt.title('Salary Distribution')
+            plt.xlabel('Salary')
+            plt.ylabel('Frequency')
+            plt.tight_layout()
+            
+            plots['salary_distribution'] = save_figure(folder, 'salary_distribution', version)
+    except Exception as e:
+        print(f"Error generating salary distribution plot: {str(e)}")
+    
+    # Bar Chart - Most active employers
+    try:
+        employer_counts = job_stats['top_employers']
+        
+        if employer_counts:
+            employer_labels = [emp.get('name') or str(emp['_id']) for emp in employer_counts]
+            job_counts = [emp['job_count'] for emp in employer_counts]
+            
+            plt.figure(figsize=(10, 6))
+            plt.bar(employer_labels, job_counts)
+            plt.title('Top 10 Most Active Employers')
+            plt.xlabel('Employer')
+            plt.ylabel('Number of Jobs Posted')
+            plt.xticks(rotation=45)
+            plt.tight_layout()
+            
+            plots['top_employers'] = save_figure(folder, 'top_employers', version)
+    except Exception as e:
+        print(f"Error generating top employers plot: {str(e)}")
+    
+    return plots
+
+
+class ChartCache:
+    """Serves the newest rendered chart set and re-renders when the data changes"""
+
+    def __init__(self, db, folder, timer=None):
+        self.db = db
+        self.folder = folder
+        # Optional context manager factory timing each render, e.g. RequestMetrics.track
+        self.timer = timer or (lambda section: nullcontext())
+        self._lock = threading.Lock()
+        self._rendering = None
+        # Versions are hashes, so their order is the order get() first saw them in
+        self._seen = None
+        self._sequence = 0
+        self._current_sequence = -1
+        self._version = None
+        self._plots = {}
+        self._images = {}
+
+    def _manifest_path(self, version):
+        return os.path.join(self.folder, f'charts.{version}.json')
+
+    def _load_manifest(self, version):
+        """Pick up a chart set another worker already rendered"""
+        try:
+            with open(self._manifest_path(version)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self):
+        """Return {plot name: filename} for the newest available chart set"""
+        version = data_version(self.db)
+        with self._lock:
+            if version != self._seen:
+                self._seen = version
+                self._sequence += 1
+            sequence = self._sequence
+            if version != self._version:
+                plots = self._load_manifest(version)
+                if plots is not None:
+                    self._set_current(version, plots, sequence)
+                elif self._rendering != version:
+                    self._rendering = version
+                    threading.Thread(target=self._render, args=(version, sequence), daemon=True).start()
+            return dict(self._plots)
+
+    def _set_current(self, version, plots, sequence):
+        """Serve a chart set unless a newer one is already being served"""
+        if sequence <= self._current_sequence:
+            return
+        self._current_sequence = sequence
+        self._version = version
+        self._plots = plots
+        self._images = {}
+
+    def _render(self, version, sequence):
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with _render_lock:
+                with self._lock:
+                    # The data moved on while this render waited for the previous one
+                    if sequence < self._sequence:
+                        return
+                with self.timer('generate_admin_plots'):
+                    plots = generate_admin_plots(self.db, self.folder, version)
+            _write_atomic(self._manifest_path(version), lambda f: f.write(json.dumps(plots).encode()))
+            with self._lock:
+                self._set_current(version, plots, sequence)
+            self._remove_old_versions()
+        except Exception as e:
+            print(f"Error rendering admin charts: {str(e)}")
+        finally:
+            with self._lock:
+                if self._rendering == version:
+                    self._rendering = None
+
+    def _remove_old_versions(self):
+        """Keep only the newest few chart sets; pages in flight may still reference the previous one"""
+        manifests = sorted(
+            (entry for entry in os.scandir(self.folder) if entry.name.startswith('charts.') and entry.name.endswith('.json')),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True
+        )
+        for entry in manifests[CHART_VERSIONS_KEPT:]:
+            version = entry.name[len('charts.'):-len('.json')]
+            for other in os.scandir(self.folder):
+                if other.name.endswith(f'.{version}.png') or other.name == entry.name:
+                    try:
+                        os.unlink(other.path)
+                    except OSError:
+                        pass
+
+    def read(self, filename):
+        """Return the PNG bytes for a rendered chart, or None if it does not exist"""
+        if os.path.basename(filename) != filename or not filename.endswith('.png'):
+            return None
+        with self._lock:
+            if filename in self._images:
+                return self._images[filename]
+        try:
+            with open(os.path.join(self.folder, filename), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            if filename in self._plots.values():
+                self._images[filename] = data
+        return data
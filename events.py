@@ -0,0 +1,201 @@
+"""Application events pushed to dashboards over Server-Sent Events.
+
+apply_job and the status update routes publish events (a new application,
+a status change) addressed to the users concerned. EventBroker fans them out
+to the event streams those users have open in this worker, through a
+bounded queue per stream. A slow client that lets its queue fill up loses
+the overflow and is told to resync instead of holding memory.
+
+How events travel between workers is up to the backend. LocalBackend
+delivers inside the publishing process only, which is enough for a single
+worker and for development. MongoEventBackend writes events to a capped
+collection that every worker tails, the same way user cache invalidations
+travel, and can replay recent events to a client reconnecting with
+Last-Event-ID.
+"""
+import json
+import queue
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from bson import ObjectId
+
+from capped_log import CappedTail
+
+EVENTS_COLLECTION = 'app_events'
+EVENT_LOG_BYTES = 8 * 1024 * 1024
+MAX_REPLAY = 100
+
+
+class TooManyStreams(Exception):
+    """Raised when this worker already serves the maximum number of event streams"""
+
+
+def format_sse(event):
+    """An event in the text/event-stream wire format"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+class Subscription:
+    """One open event stream of a user"""
+
+    def __init__(self, broker, user_id, queue_size):
+        self.broker = broker
+        self.user_id = user_id
+        self.overflowed = False
+        self._queue = queue.Queue(queue_size)
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """The next event, a resync event after an overflow, or None when timeout passes first"""
+        if self.overflowed:
+            self.overflowed = False
+            with self._queue.mutex:
+                self._queue.queue.clear()
+            return {'id': '', 'type': 'resync', 'data': {}}
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """Per-process fan-out of published events to the subscribed users' streams"""
+
+    def __init__(self, backend=None, max_streams=100, queue_size=100):
+        self.backend = backend or LocalBackend()
+        self.max_streams = max_streams
+        self.queue_size = queue_size
+        self.published = 0
+        self.delivered = 0
+        self._subscriptions = defaultdict(set)
+        self._streams = 0
+        self._lock = threading.Lock()
+        self.backend.connect(self.deliver)
+
+    def subscribe(self, user_id):
+        """Open a stream for a user, raising TooManyStreams when this worker is full"""
+        self.backend.ensure_started()
+        with self._lock:
+            if self._streams >= self.max_streams:
+                raise TooManyStreams()
+            subscription = Subscription(self, user_id, self.queue_size)
+            self._subscriptions[user_id].add(subscription)
+            self._streams += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions and subscription in subscriptions:
+                subscriptions.discard(subscription)
+                self._streams -= 1
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_ids, event_type, data):
+        """Send an event to every open stream of the given users, in any worker"""
+        try:
+            self.backend.ensure_started()
+            self.backend.publish({'type': event_type, 'data': data, 'user_ids': list(dict.fromkeys(user_ids))})
+            self.published += 1
+        except Exception as e:
+            print(f"Error publishing {event_type} event: {str(e)}")
+
+    def deliver(self, event):
+        """Hand an event from the backend to the local streams it is addressed to"""
+        with self._lock:
+            subscriptions = [s for user_id in event['user_ids'] for s in self._subscriptions.get(user_id, ())]
+        for subscription in subscriptions:
+            subscription.put(event)
+        self.delivered += len(subscriptions)
+
+    def replay(self, user_id, last_event_id):
+        """Events for a user published after last_event_id, as far as the backend remembers"""
+        try:
+            return self.backend.replay(user_id, last_event_id)
+        except Exception as e:
+            print(f"Error replaying events: {str(e)}")
+            return []
+
+    def stats(self):
+        with self._lock:
+            return {
+                'streams': self._streams,
+                'users': len(self._subscriptions),
+                'published': self.published,
+                'delivered': self.delivered
+            }
+
+
+class LocalBackend:
+    """Delivers events within this process only"""
+
+    def connect(self, deliver):
+        self._deliver = deliver
+
+    def ensure_started(self):
+        pass
+
+    def publish(self, event):
+        event['id'] = str(ObjectId())
+        self._deliver(event)
+
+    def replay(self, user_id, last_event_id):
+        return []
+
+
+class MongoEventBackend:
+    """Carries events between workers through a capped collection that each worker tails"""
+
+    def __init__(self, db, retry_interval=1.0):
+        self.collection = db[EVENTS_COLLECTION]
+        self._deliver = None
+        self._tail = CappedTail(
+            db, EVENTS_COLLECTION, EVENT_LOG_BYTES,
+            on_document=lambda doc: self._deliver(self._event(doc)),
+            retry_interval=retry_interval
+        )
+
+    @staticmethod
+    def _event(doc):
+        return {'id': str(doc['_id']), 'type': doc['type'], 'data': doc['data'], 'user_ids': doc['user_ids']}
+
+    def connect(self, deliver):
+        self._deliver = deliver
+
+    def ensure_started(self):
+        """Start tailing on the first subscribe or publish in this process"""
+        self._tail.ensure_started()
+
+    def stop(self):
+        self._tail.stop()
+
+    def publish(self, event):
+        self.collection.insert_one(dict(event, created_at=datetime.utcnow()))
+
+    def replay(self, user_id, last_event_id):
+        try:
+            after = ObjectId(last_event_id)
+        except Exception:
+            return []
+        # Events follow the last one seen in insertion order; _ids from other workers are not increasing
+        events = None
+        for doc in self.collection.find({'user_ids': user_id}).sort('$natural', 1):
+            if events is None:
+                if doc['_id'] == after:
+                    events = []
+            elif len(events) < MAX_REPLAY:
+                events.append(self._event(doc))
+            else:
+                break
+        return events or []
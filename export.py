@@ -0,0 +1,163 @@
+"""Streaming export of applications joined with their job and job seeker.
+
+Applications are read with one cursor in date order. Every batch_size of
+them, the jobs and job seekers they refer to are loaded with one $in query
+each, so the join costs two queries per batch instead of two per row. Rows
+are encoded and handed on batch by batch: the header goes out before the
+first query returns, and memory holds a single batch however many rows the
+export has.
+
+CSV and NDJSON are always available. Parquet needs pyarrow, which is
+imported on first use like the plotting stack; each batch becomes a row
+group.
+"""
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from loaders import BatchLoader
+
+EXPORT_COLUMNS = (
+    'application_id', 'date_applied', 'status',
+    'job_id', 'job_title', 'company_name', 'category',
+    'job_seeker_id', 'seeker_name', 'seeker_email'
+)
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet')
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+APPLICATION_EXPORT_PROJECTION = {'job_id': 1, 'job_seeker_id': 1, 'status': 1, 'date_applied': 1}
+JOB_EXPORT_PROJECTION = {'title': 1, 'company_name': 1, 'category': 1}
+SEEKER_EXPORT_PROJECTION = {'name': 1, 'email': 1}
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parse_date_range(since, until):
+    """A date_applied query for YYYY-MM-DD bounds, both inclusive; raises ValueError on a bad date"""
+    query = {}
+    if since:
+        query['$gte'] = datetime.strptime(since, '%Y-%m-%d')
+    if until:
+        query['$lt'] = datetime.strptime(until, '%Y-%m-%d') + timedelta(days=1)
+    return {'date_applied': query} if query else {}
+
+
+def application_batches(db, query, batch_size=1000):
+    """Lists of joined export rows, batch_size applications at a time"""
+    cursor = db.applications.find(query, APPLICATION_EXPORT_PROJECTION).sort('date_applied', 1).batch_size(batch_size)
+    batch = []
+    for application in cursor:
+        batch.append(application)
+        if len(batch) >= batch_size:
+            yield join_batch(db, batch)
+            batch = []
+    if batch:
+        yield join_batch(db, batch)
+
+
+def join_batch(db, applications):
+    """Export rows for a batch of applications, loading their jobs and seekers in one query each"""
+    # A fresh loader per batch keeps the join cache as small as the batch
+    jobs = BatchLoader(db.job_posts, JOB_EXPORT_PROJECTION).load_many(
+        [application.get('job_id') for application in applications]
+    )
+    seekers = BatchLoader(db.users, SEEKER_EXPORT_PROJECTION).load_many(
+        [application.get('job_seeker_id') for application in applications]
+    )
+    rows = []
+    for application in applications:
+        job = jobs.get(application.get('job_id')) or {}
+        seeker = seekers.get(application.get('job_seeker_id')) or {}
+        date_applied = application.get('date_applied')
+        rows.append({
+            'application_id': str(application['_id']),
+            'date_applied': date_applied.isoformat() if isinstance(date_applied, datetime) else '',
+            'status': application.get('status', ''),
+            'job_id': str(application.get('job_id', '')),
+            'job_title': job.get('title', ''),
+            'company_name': job.get('company_name', ''),
+            'category': job.get('category', ''),
+            'job_seeker_id': str(application.get('job_seeker_id', '')),
+            'seeker_name': seeker.get('name', ''),
+            'seeker_email': seeker.get('email', '')
+        })
+    return rows
+
+
+def _csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    yield buffer.getvalue().encode('utf-8')
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_chunks(batches):
+    for rows in batches:
+        yield ''.join(json.dumps(row) + '\n' for row in rows).encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands pyarrow's output on instead of keeping it"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_chunks(batches):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in batches:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def export_applications(db, fmt, query=None, batch_size=1000):
+    """The export as an iterator of byte chunks in the given format"""
+    batches = application_batches(db, query or {}, batch_size)
+    if fmt == 'csv':
+        return _csv_chunks(batches)
+    if fmt == 'ndjson':
+        return _ndjson_chunks(batches)
+    if fmt == 'parquet':
+        return _parquet_chunks(batches)
+    raise ValueError(f"Unknown export format: {fmt}")
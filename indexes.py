@@ -0,0 +1,129 @@
+"""Index registry for the portal's collections and an explain()-based advisor.
+
+Every index the routes rely on is declared here once. ensure_indexes() applies
+the registry idempotently (create_indexes is a no-op for indexes that already
+exist), and advise() explains each route's canonical queries to catch any
+that still fall back to a collection scan.
+"""
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+
+from outbox import OUTBOX_COLLECTION
+from search import JOB_SEARCH_INDEX, JOB_SEARCH_WEIGHTS, JOB_LISTING_SORT
+
+INDEXES = {
+    'users': [
+        # login/register look users up by email; one account per address
+        IndexModel([('email', ASCENDING)], name='users_email', unique=True),
+        # admin analytics counts users per role
+        IndexModel([('role', ASCENDING)], name='users_role'),
+        # resume garbage collection looks up references to each GridFS file
+        IndexModel([('resume_id', ASCENDING)], name='users_resume', sparse=True)
+    ],
+    'job_posts': [
+        IndexModel(
+            [(field, TEXT) for field in JOB_SEARCH_WEIGHTS],
+            weights=JOB_SEARCH_WEIGHTS,
+            name=JOB_SEARCH_INDEX,
+            default_language='english'
+        ),
+        IndexModel(JOB_LISTING_SORT, name='job_listing_order'),
+        IndexModel([('employer_id', ASCENDING), ('date_posted', DESCENDING)], name='job_posts_employer'),
+        IndexModel([('category', ASCENDING), ('salary', ASCENDING)], name='job_posts_category_salary'),
+        IndexModel([('salary', ASCENDING)], name='job_posts_salary')
+    ],
+    'applications': [
+        # A job seeker can apply to a job only once
+        IndexModel([('job_id', ASCENDING), ('job_seeker_id', ASCENDING)], name='applications_job_seeker', unique=True),
+        IndexModel([('job_seeker_id', ASCENDING), ('date_applied', DESCENDING)], name='applications_seeker_date'),
+        IndexModel([('job_id', ASCENDING), ('date_applied', DESCENDING)], name='applications_job_date'),
+        IndexModel([('date_applied', DESCENDING)], name='applications_date')
+    ],
+    'fs.files': [
+        # Resumes are content-addressed; one stored file per distinct content
+        IndexModel(
+            [('sha256', ASCENDING)],
+            name='resume_sha256',
+            unique=True,
+            partialFilterExpression={'sha256': {'$exists': True}}
+        )
+    ],
+    OUTBOX_COLLECTION: [
+        # Workers claim due messages in next_attempt_at order
+        IndexModel([('status', ASCENDING), ('next_attempt_at', ASCENDING)], name='outbox_due'),
+        IndexModel([('status', ASCENDING), ('claimed_at', ASCENDING)], name='outbox_claimed')
+    ]
+}
+
+
+def ensure_indexes(db):
+    """Create every registered index, returning {collection: {'created': [names], 'failed': {name: error}}}.
+
+    Indexes are created one at a time, so one that cannot be built (typically a
+    unique index over existing duplicates) leaves the others in place. A failed
+    unique index is reported loudly: the routes rely on it to reject duplicates.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        created, failed = [], {}
+        for model in models:
+            name = model.document['name']
+            try:
+                created.extend(db[collection_name].create_indexes([model]))
+            except Exception as e:
+                failed[name] = str(e)
+                if model.document.get('unique'):
+                    print(f"ERROR: unique index {name} on {collection_name} could not be built, "
+                          f"so duplicates are not prevented (remove them and run flask create-indexes): {str(e)}")
+                else:
+                    print(f"Error creating index {name} on {collection_name}: {str(e)}")
+        report[collection_name] = {'created': created, 'failed': failed}
+    return report
+
+
+def canonical_queries():
+    """The query shapes each route issues, as (route, collection, filter, sort)"""
+    some_id = ObjectId()
+    return [
+        ('login/register', 'users', {'email': 'someone@example.com'}, None),
+        ('admin_analytics', 'users', {'role': 'employer'}, None),
+        ('job_seeker_dashboard', 'job_posts', {}, JOB_LISTING_SORT),
+        ('job_seeker_dashboard', 'job_posts', {'category': 'IT', 'salary': {'$gte': 50000.0}}, JOB_LISTING_SORT),
+        ('job_seeker_dashboard', 'job_posts', {'$text': {'$search': 'python developer'}}, None),
+        ('job_seeker_dashboard', 'applications', {'job_seeker_id': some_id}, [('date_applied', DESCENDING)]),
+        ('employer_dashboard', 'job_posts', {'employer_id': some_id}, None),
+        ('employer_dashboard', 'applications', {'job_id': {'$in': [some_id]}}, [('date_applied', DESCENDING)]),
+        ('apply_job', 'applications', {'job_id': some_id, 'job_seeker_id': some_id}, None)
+    ]
+
+
+def _plan_stages(plan):
+    """Collect every stage name in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+def advise(db):
+    """Explain the canonical queries, returning one report row per query"""
+    report = []
+    for route, collection_name, query, sort in canonical_queries():
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = _plan_stages(cursor.explain().get('queryPlanner', {}).get('winningPlan', {}))
+        report.append({
+            'route': route,
+            'collection': collection_name,
+            'query': query,
+            'stages': stages,
+            'collscan': 'COLLSCAN' in stages
+        })
+    return report
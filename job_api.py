@@ -0,0 +1,93 @@
+"""Serialization and validators for the read-only JSON job API.
+
+Listing ETags are derived from the jobs generation (see search.jobs_generation)
+and the request that selects the result window: filters, cursor, page size
+and fields. A poll can therefore be answered 304 Not Modified after reading a
+single small document, without running the listing query. A job's own ETag
+is a hash of its JSON body.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from search import JOB_CARD_PROJECTION
+
+# Fields anyone may request with ?fields=; employer_id and internal fields are never exposed
+JOB_PUBLIC_FIELDS = (
+    'title', 'description', 'requirements', 'salary', 'category', 'location',
+    'company_name', 'company_website', 'date_posted'
+)
+
+# Contact details, which like the job pages the API only shows to logged-in users
+JOB_CONTACT_FIELDS = ('company_address', 'contact_person', 'contact_email', 'contact_phone')
+
+# Fields of a listing entry when none are requested: the dashboard's job card
+JOB_LISTING_FIELDS = tuple(field for field in JOB_CARD_PROJECTION if field in JOB_PUBLIC_FIELDS)
+
+MAX_API_PAGE_SIZE = 100
+
+
+def readable_fields(logged_in):
+    """The job fields a client may read"""
+    return JOB_PUBLIC_FIELDS + JOB_CONTACT_FIELDS if logged_in else JOB_PUBLIC_FIELDS
+
+
+def parse_fields(value, default, allowed=JOB_PUBLIC_FIELDS):
+    """Parse a comma-separated sparse fieldset, raising ValueError on fields outside allowed"""
+    if not value:
+        return tuple(default)
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    hidden = [field for field in fields if field in JOB_CONTACT_FIELDS and field not in allowed]
+    if hidden:
+        raise ValueError(f"Log in to read field(s): {', '.join(hidden)}")
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def has_contact_fields(fields):
+    """Whether a response holds contact details, which shared caches must not keep"""
+    return any(field in JOB_CONTACT_FIELDS for field in fields)
+
+
+def listing_projection(fields, requested):
+    """job_posts projection for a listing; the card excerpt is kept unless fields were requested"""
+    if not requested:
+        return dict(JOB_CARD_PROJECTION)
+    # date_posted is always read because the page cursor is built from it
+    return {field: 1 for field in fields + ('date_posted',)}
+
+
+def _json_value(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat() + 'Z'
+    return value
+
+
+def job_to_json(job, fields):
+    """A job document as a JSON-ready dict holding its id and the requested fields"""
+    data = {'id': str(job['_id'])}
+    for field in fields:
+        if field in job:
+            data[field] = _json_value(job[field])
+    return data
+
+
+def listing_etag(generation, filters, cursor, page_size, fields, requested):
+    """Strong ETag for one listing window at the given jobs generation.
+
+    requested tells whether fields were asked for explicitly, which decides
+    between the card excerpt and the full description (see listing_projection).
+    """
+    key = json.dumps([generation, filters, cursor, page_size, fields, requested], sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def body_etag(body):
+    """Strong ETag for a response body"""
+    return hashlib.sha1(body).hexdigest()
@@ -0,0 +1,129 @@
+"""Bulk job import from CSV or NDJSON.
+
+Rows are read from the upload one at a time, validated against the fields
+post_job takes, and inserted in unordered insert_many batches, so memory
+stays flat however large the file is. A bad row is reported by its row
+number and skipped; it never stops the rest of the import.
+"""
+import codecs
+import csv
+import json
+from datetime import datetime
+
+from pymongo.errors import BulkWriteError
+
+from rollups import record_jobs_posted
+from search import bump_jobs_generation
+
+# The post_job form fields: required ones are read with request.form[...], optional ones with .get()
+REQUIRED_JOB_FIELDS = (
+    'title', 'description', 'requirements', 'salary', 'category', 'location',
+    'company_name', 'company_address'
+)
+OPTIONAL_JOB_FIELDS = ('company_website', 'contact_person', 'contact_email', 'contact_phone')
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+# Row errors kept in the report; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename):
+    """Import format from a file name, or None when the extension is not recognised"""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'csv':
+        return 'csv'
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return None
+
+
+def read_rows(stream, fmt):
+    """Yield (row number, row dict or parse error) from a binary stream, one row at a time"""
+    lines = codecs.getreader('utf-8-sig')(stream)
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Numbered by the line the row ends on, so quoted multi-line fields stay accurate
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"Invalid JSON: {str(e)}")
+            continue
+        yield number, row if isinstance(row, dict) else ValueError('Expected a JSON object')
+
+
+def validate_job(row, employer_id, now):
+    """Build a job_posts document from an import row, raising ValueError when it is invalid"""
+    if isinstance(row, Exception):
+        raise row
+    job = {}
+    for field in REQUIRED_JOB_FIELDS + OPTIONAL_JOB_FIELDS:
+        value = row.get(field)
+        value = '' if value is None else str(value).strip()
+        if not value and field in REQUIRED_JOB_FIELDS:
+            raise ValueError(f"Missing {field}")
+        job[field] = value
+    try:
+        job['salary'] = float(job['salary'])
+    except ValueError:
+        raise ValueError(f"Invalid salary: {job['salary']!r}")
+    job['employer_id'] = employer_id
+    job['date_posted'] = now
+    return job
+
+
+def _insert_batch(db, batch, report):
+    """Insert one batch unordered, reporting the rows MongoDB rejected"""
+    rows, docs = zip(*batch)
+    failed = set()
+    try:
+        db.job_posts.insert_many(list(docs), ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get('writeErrors', []):
+            failed.add(error['index'])
+            _report_error(report, rows[error['index']], error.get('errmsg', 'Insert failed'))
+    inserted = [doc for i, doc in enumerate(docs) if i not in failed]
+    report['inserted'] += len(inserted)
+    if inserted:
+        bump_jobs_generation(db)
+        record_jobs_posted(db, inserted)
+
+
+def _report_error(report, row, message):
+    report['failed'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({'row': row, 'error': message})
+
+
+def import_jobs(db, stream, fmt, employer_id, batch_size=1000):
+    """Import jobs for an employer from a CSV or NDJSON stream, returning a report.
+
+    The report counts inserted and failed rows and lists the first
+    MAX_REPORTED_ERRORS row errors as {'row': number, 'error': message}.
+    When the file stops being readable part way, 'aborted' says why.
+    """
+    report = {'inserted': 0, 'failed': 0, 'errors': []}
+    now = datetime.utcnow()
+    batch = []
+    try:
+        for number, row in read_rows(stream, fmt):
+            try:
+                batch.append((number, validate_job(row, employer_id, now)))
+            except ValueError as e:
+                _report_error(report, number, str(e))
+                continue
+            if len(batch) >= batch_size:
+                _insert_batch(db, batch, report)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        # The rest of the file cannot be read; keep what was imported so far
+        report['aborted'] = f"Could not read the file: {str(e)}"
+    if batch:
+        _insert_batch(db, batch, report)
+    return report
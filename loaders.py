@@ -0,0 +1,46 @@
+"""Request-scoped batch loaders for joining documents by id.
+
+Instead of one find_one per row, callers hand a loader every id they need and
+it resolves them with a single $in query, deduplicating repeated ids and
+caching results for the rest of the request.
+"""
+from flask import g
+
+
+class BatchLoader:
+    """Loads documents of one collection by _id in batches"""
+
+    def __init__(self, collection, projection=None):
+        self.collection = collection
+        self.projection = projection
+        self._cache = {}
+
+    def prime(self, docs):
+        """Seed the cache with documents that were already fetched"""
+        for doc in docs:
+            self._cache[doc['_id']] = doc
+
+    def load_many(self, ids):
+        """Return {_id: document} for the given ids using at most one query"""
+        missing = {doc_id for doc_id in ids if doc_id is not None and doc_id not in self._cache}
+        if missing:
+            for doc in self.collection.find({'_id': {'$in': list(missing)}}, self.projection):
+                self._cache[doc['_id']] = doc
+            # Remember misses too so they are not queried again
+            for doc_id in missing:
+                self._cache.setdefault(doc_id, None)
+        return {doc_id: self._cache.get(doc_id) for doc_id in ids if self._cache.get(doc_id) is not None}
+
+    def load(self, doc_id):
+        """Return a single document, or None when it does not exist"""
+        return self.load_many([doc_id]).get(doc_id)
+
+
+def request_loader(collection, projection=None):
+    """Return the loader for a collection/projection pair for the current request"""
+    if '_loaders' not in g:
+        g._loaders = {}
+    key = (collection.full_name, tuple(sorted(projection or ())))
+    if key not in g._loaders:
+        g._loaders[key] = BatchLoader(collection, projection)
+    return g._loaders[key]
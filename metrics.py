@@ -0,0 +1,229 @@
+"""Per-request query accounting, N+1 detection and Prometheus exposition.
+
+RequestMetrics is both a pymongo CommandListener and the store behind the
+Flask request hooks. While a request is active on a thread, every MongoDB
+command it issues is counted and timed against the request, and so is the
+time spent inside tracked sections such as send_email. When the request
+finishes, the totals are folded into per-route counters and histograms, and
+a request that repeats the same command shape more than the N+1 threshold
+(the classic find_one-per-row loop) is counted and logged.
+
+Counters are per process; scrape every worker, or aggregate in Prometheus.
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Where each command keeps the part of the query that gives it its shape
+_SHAPE_FIELDS = ('filter', 'query', 'q', 'pipeline')
+
+
+def _structure(value):
+    """Replace every literal in a query with '?' so queries differing only in values compare equal"""
+    if isinstance(value, dict):
+        return {key: _structure(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        return [_structure(value[0])] if value else []
+    return '?'
+
+
+def command_shape(event):
+    """'<command> <collection> <query structure>' for a CommandStartedEvent"""
+    command = event.command
+    collection = command.get(event.command_name)
+    body = command
+    for batch in ('updates', 'deletes'):
+        if command.get(batch):
+            body = command[batch][0]
+    query = next((body[field] for field in _SHAPE_FIELDS if field in body), None)
+    return f'{event.command_name} {collection} {_structure(query) if query is not None else ""}'.rstrip()
+
+
+class _RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.commands = 0
+        self.db_seconds = 0.0
+        self.shapes = Counter()
+        self.sections = defaultdict(float)
+        self.pending = {}
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+class RequestMetrics(monitoring.CommandListener):
+    """Per-route request, database and section metrics for one process"""
+
+    def __init__(self, n_plus_one_threshold=10, slow_request_seconds=0):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slow_request_seconds = slow_request_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.latency = defaultdict(_Histogram)
+        self.db_commands = Counter()
+        self.db_seconds = Counter()
+        self.section_seconds = Counter()
+        self.section_calls = Counter()
+        self.n_plus_one = Counter()
+        self.slow_requests = Counter()
+
+    # Request lifecycle, driven by the Flask hooks
+
+    def begin(self):
+        """Start accounting for the request on this thread"""
+        self._local.stats = _RequestStats()
+
+    def finish(self, route, status):
+        """Fold the finished request into the per-route metrics"""
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            return
+        self._local.stats = None
+        elapsed = time.perf_counter() - stats.started
+        repeated = [(shape, count) for shape, count in stats.shapes.items() if count > self.n_plus_one_threshold]
+        slow = self.slow_request_seconds and elapsed >= self.slow_request_seconds
+
+        with self._lock:
+            self.requests[(route, str(status))] += 1
+            self.latency[route].observe(elapsed)
+            self.db_commands[route] += stats.commands
+            self.db_seconds[route] += stats.db_seconds
+            for section, seconds in stats.sections.items():
+                self.section_seconds[(section, route)] += seconds
+            for shape, _ in repeated:
+                self.n_plus_one[(route, shape.split(' {')[0])] += 1
+            if slow:
+                self.slow_requests[route] += 1
+
+        for shape, count in repeated:
+            print(f"N+1 query pattern in {route}: {count} x {shape}")
+        if slow:
+            sections = ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in stats.sections.items())
+            print(f"Slow request {route} ({status}): {elapsed * 1000:.0f} ms, "
+                  f"{stats.commands} db commands in {stats.db_seconds * 1000:.0f} ms"
+                  + (f", {sections}" if sections else ''))
+
+    # Tracked sections
+
+    @contextmanager
+    def track(self, section):
+        """Time a block of code, against the current request if there is one"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = getattr(self._local, 'stats', None)
+            if stats is not None:
+                stats.sections[section] += elapsed
+            else:
+                with self._lock:
+                    self.section_seconds[(section, '')] += elapsed
+            with self._lock:
+                self.section_calls[section] += 1
+
+    def timed(self, section):
+        """Decorator form of track()"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.track(section):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # pymongo CommandListener
+
+    def started(self, event):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            return
+        stats.commands += 1
+        stats.shapes[command_shape(event)] += 1
+        stats.pending[event.request_id] = time.perf_counter()
+
+    def succeeded(self, event):
+        self._command_done(event)
+
+    def failed(self, event):
+        self._command_done(event)
+
+    def _command_done(self, event):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            return
+        started = stats.pending.pop(event.request_id, None)
+        stats.db_seconds += event.duration_micros / 1e6 if started is None else time.perf_counter() - started
+
+    # Prometheus text exposition
+
+    def render(self, gauges=None):
+        """Metrics in the Prometheus text format; gauges adds {name: {label value: number}} families"""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            family('portal_requests_total', 'counter', 'Requests handled, by route and status.')
+            for (route, status), count in sorted(self.requests.items()):
+                lines.append(f'portal_requests_total{{route="{route}",status="{status}"}} {count}')
+
+            family('portal_request_duration_seconds', 'histogram', 'Request latency, by route.')
+            for route, histogram in sorted(self.latency.items()):
+                for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+                    lines.append(f'portal_request_duration_seconds_bucket{{route="{route}",le="{bound}"}} {count}')
+                lines.append(f'portal_request_duration_seconds_bucket{{route="{route}",le="+Inf"}} {histogram.count}')
+                lines.append(f'portal_request_duration_seconds_sum{{route="{route}"}} {histogram.total}')
+                lines.append(f'portal_request_duration_seconds_count{{route="{route}"}} {histogram.count}')
+
+            family('portal_db_commands_total', 'counter', 'MongoDB commands issued, by route.')
+            for route, count in sorted(self.db_commands.items()):
+                lines.append(f'portal_db_commands_total{{route="{route}"}} {count}')
+
+            family('portal_db_seconds_total', 'counter', 'Time spent in MongoDB commands, by route.')
+            for route, seconds in sorted(self.db_seconds.items()):
+                lines.append(f'portal_db_seconds_total{{route="{route}"}} {seconds}')
+
+            family('portal_section_seconds_total', 'counter', 'Time spent in tracked sections, by route ("" outside requests).')
+            for (section, route), seconds in sorted(self.section_seconds.items()):
+                lines.append(f'portal_section_seconds_total{{section="{section}",route="{route}"}} {seconds}')
+
+            family('portal_section_calls_total', 'counter', 'Calls to tracked sections.')
+            for section, count in sorted(self.section_calls.items()):
+                lines.append(f'portal_section_calls_total{{section="{section}"}} {count}')
+
+            family('portal_n_plus_one_total', 'counter', 'Requests repeating one command shape past the N+1 threshold.')
+            for (route, shape), count in sorted(self.n_plus_one.items()):
+                lines.append(f'portal_n_plus_one_total{{route="{route}",command="{shape}"}} {count}')
+
+            family('portal_slow_requests_total', 'counter', 'Requests slower than the slow request threshold.')
+            for route, count in sorted(self.slow_requests.items()):
+                lines.append(f'portal_slow_requests_total{{route="{route}"}} {count}')
+
+        for name, values in sorted((gauges or {}).items()):
+            family(name, 'gauge', name.replace('_', ' ') + '.')
+            for label, value in sorted(values.items()):
+                lines.append(f'{name}{{name="{label}"}} {float(value)}')
+
+        return '\n'.join(lines) + '\n'
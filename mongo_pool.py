@@ -0,0 +1,119 @@
+"""Shared MongoDB client settings and connection pool instrumentation.
+
+The app opens a single MongoClient (through Flask-PyMongo) that serves both
+the routes and GridFS. client_options() builds its pool, read preference and
+compression settings from the app config, and PoolMonitor listens to the
+driver's pool events to report checkout wait times and pool saturation.
+"""
+import threading
+import time
+
+from pymongo import monitoring
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Collects checkout wait and saturation statistics from pymongo pool events"""
+
+    def __init__(self, max_pool_size):
+        self.max_pool_size = max_pool_size
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self._started = threading.local()
+        self._lock = threading.Lock()
+
+    def _checkout_finished(self, event):
+        # pymongo >= 4.7 reports the wait on the event; otherwise time it per thread
+        duration = getattr(event, 'duration', None)
+        if duration is None:
+            started = getattr(self._started, 'at', None)
+            duration = time.perf_counter() - started if started is not None else 0.0
+        self.waiting = max(self.waiting - 1, 0)
+        return duration
+
+    def connection_check_out_started(self, event):
+        self._started.at = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            duration = self._checkout_finished(event)
+            self.checkouts += 1
+            self.wait_seconds_total += duration
+            self.wait_seconds_max = max(self.wait_seconds_max, duration)
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._checkout_finished(event)
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    # Pool lifecycle events the statistics do not need
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self):
+        """Checkout wait and saturation counters"""
+        with self._lock:
+            return {
+                'max_pool_size': self.max_pool_size,
+                'checked_out': self.checked_out,
+                'max_checked_out': self.max_checked_out,
+                'saturation': self.checked_out / self.max_pool_size if self.max_pool_size else 0.0,
+                'waiting': self.waiting,
+                'max_waiting': self.max_waiting,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'wait_seconds_total': self.wait_seconds_total,
+                'wait_seconds_avg': self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                'wait_seconds_max': self.wait_seconds_max,
+                'connections_open': self.connections_created - self.connections_closed
+            }
+
+
+def client_options(config, event_listeners=()):
+    """MongoClient keyword arguments for the configured pool, read preference and compression"""
+    options = {
+        'maxPoolSize': config['MONGO_MAX_POOL_SIZE'],
+        'minPoolSize': config['MONGO_MIN_POOL_SIZE'],
+        'waitQueueTimeoutMS': config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+        'readPreference': config['MONGO_READ_PREFERENCE'],
+        'event_listeners': list(event_listeners)
+    }
+    if config['MONGO_COMPRESSORS']:
+        options['compressors'] = config['MONGO_COMPRESSORS']
+    return options
@@ -0,0 +1,303 @@
+"""Durable email outbox drained by a pool of background SMTP workers.
+
+Requests only insert a message into the ``email_outbox`` collection. Worker
+threads claim pending messages in batches, deliver them over persistent SMTP
+connections and record the outcome on each message (sent, retrying with
+exponential backoff, or failed after the last attempt).
+"""
+import os
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+OUTBOX_COLLECTION = 'email_outbox'
+
+
+def _outbox_message(to, subject, body, html, now):
+    return {
+        'to': to,
+        'subject': subject,
+        'body': body,
+        'html': html,
+        'status': 'pending',
+        'attempts': 0,
+        'last_error': None,
+        'created_at': now,
+        'next_attempt_at': now,
+        'claimed_at': None,
+        'sent_at': None
+    }
+
+
+def enqueue_email(db, to, subject, body, html=None):
+    """Write a message to the outbox, returning its id"""
+    result = db[OUTBOX_COLLECTION].insert_one(_outbox_message(to, subject, body, html, datetime.utcnow()))
+    return result.inserted_id
+
+
+def enqueue_emails(db, messages):
+    """Write (to, subject, body, html) messages to the outbox with one insert, returning their ids"""
+    now = datetime.utcnow()
+    docs = [_outbox_message(to, subject, body, html, now) for to, subject, body, html in messages]
+    if not docs:
+        return []
+    return db[OUTBOX_COLLECTION].insert_many(docs).inserted_ids
+
+
+def outbox_status(db):
+    """Count outbox messages per status"""
+    pipeline = [{'$group': {'_id': '$status', 'count': {'$sum': 1}}}]
+    return {row['_id']: row['count'] for row in db[OUTBOX_COLLECTION].aggregate(pipeline)}
+
+
+def smtp_settings_from_config(config):
+    """Pick the SMTP settings out of the Flask-Mail style app config"""
+    return {
+        'host': config.get('MAIL_SERVER'),
+        'port': config.get('MAIL_PORT'),
+        'use_tls': config.get('MAIL_USE_TLS', False),
+        'use_ssl': config.get('MAIL_USE_SSL', False),
+        'username': config.get('MAIL_USERNAME'),
+        'password': config.get('MAIL_PASSWORD'),
+        'sender': formataddr(('Job Portal', config.get('MAIL_USERNAME') or ''))
+    }
+
+
+class OutboxWorkerPool:
+    """Threads that drain the outbox, each over its own reused SMTP connection"""
+
+    def __init__(self, db, smtp_settings, workers=2, batch_size=50, max_attempts=5,
+                 backoff_seconds=30, poll_interval=1.0, claim_timeout=300, idle_timeout=60):
+        self.collection = db[OUTBOX_COLLECTION]
+        self.smtp_settings = smtp_settings
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self.idle_timeout = idle_timeout
+        self._threads = []
+        self._pid = None
+        self._start_lock = threading.Lock()
+        # Messages delivered over SMTP whose 'sent' status could not be written yet
+        self._unrecorded = []
+        self._unrecorded_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def ensure_started(self):
+        """Start the worker threads in this process unless they already run here"""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Threads started before a fork do not exist in the child, so each process starts its own
+            self._threads = []
+            self.start()
+
+    def start(self):
+        """Start the worker threads"""
+        self._pid = os.getpid()
+        for worker_id in range(self.workers):
+            thread = threading.Thread(target=self._run, args=(worker_id,), name=f'outbox-worker-{worker_id}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Ask the workers to finish their current batch and exit"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self):
+        """Nudge idle workers to poll immediately (called after enqueueing)"""
+        self._wake.set()
+
+    def claim_batch(self, worker_id):
+        """Claim up to batch_size due messages for one worker, each with its own atomic update.
+
+        The batch shares a claim id, so a message can be checked for having been
+        reclaimed by another worker right before it is sent.
+        """
+        batch = []
+        claim_id = ObjectId()
+        while len(batch) < self.batch_size:
+            now = datetime.utcnow()
+            doc = self.collection.find_one_and_update(
+                {'$or': [
+                    {'status': 'pending', 'next_attempt_at': {'$lte': now}},
+                    # Reclaim messages whose worker died mid-send
+                    {'status': 'sending', 'claimed_at': {'$lt': now - timedelta(seconds=self.claim_timeout)}}
+                ]},
+                {'$set': {'status': 'sending', 'claimed_at': now, 'claimed_by': worker_id, 'claim_id': claim_id}},
+                sort=[('next_attempt_at', 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if not doc:
+                break
+            batch.append(doc)
+        return batch
+
+    def connect(self):
+        """Open and authenticate an SMTP connection"""
+        settings = self.smtp_settings
+        if settings['use_ssl']:
+            connection = smtplib.SMTP_SSL(settings['host'], settings['port'], timeout=30)
+        else:
+            connection = smtplib.SMTP(settings['host'], settings['port'], timeout=30)
+            if settings['use_tls']:
+                connection.starttls()
+        if settings['username'] and settings['password']:
+            connection.login(settings['username'], settings['password'])
+        return connection
+
+    def build_message(self, doc):
+        """Turn an outbox document into an email message"""
+        message = EmailMessage()
+        message['Subject'] = doc['subject']
+        message['From'] = self.smtp_settings['sender']
+        message['To'] = doc['to']
+        message.set_content(doc['body'])
+        if doc.get('html'):
+            message.add_alternative(doc['html'], subtype='html')
+        return message
+
+    def send_batch(self, connection, batch):
+        """Deliver a claimed batch, returning the (possibly reopened) connection"""
+        for doc in batch:
+            if not self.renew_claim(doc):
+                # Slow sends earlier in the batch let the claim go stale and another worker took it
+                continue
+            try:
+                if connection is None:
+                    connection = self.connect()
+                try:
+                    connection.send_message(self.build_message(doc))
+                except smtplib.SMTPServerDisconnected:
+                    # The reused connection went stale; reconnect once and retry
+                    connection = self.connect()
+                    connection.send_message(self.build_message(doc))
+            except Exception as e:
+                try:
+                    self.record_failure(doc, e)
+                except Exception as record_error:
+                    # Left as 'sending'; it is reclaimed after claim_timeout
+                    print(f"Error recording outbox failure: {str(record_error)}")
+                if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                    connection = None
+                continue
+            self.record_sent(doc, datetime.utcnow())
+        return connection
+
+    def renew_claim(self, doc):
+        """Refresh a message's claim right before sending it; False when it is no longer ours"""
+        try:
+            result = self.collection.update_one(
+                {'_id': doc['_id'], 'status': 'sending', 'claim_id': doc.get('claim_id')},
+                {'$set': {'claimed_at': datetime.utcnow()}}
+            )
+        except Exception as e:
+            print(f"Error renewing outbox claim: {str(e)}")
+            return False
+        return result.modified_count == 1
+
+    def record_sent(self, doc, sent_at):
+        """Mark a delivered message sent; if the write fails it is retried later, never re-sent"""
+        try:
+            self._mark_sent(doc['_id'], sent_at)
+        except Exception as e:
+            print(f"Error marking email to {doc['to']} as sent: {str(e)}")
+            with self._unrecorded_lock:
+                self._unrecorded.append((doc['_id'], sent_at))
+
+    def flush_sent(self):
+        """Retry the 'sent' writes that failed earlier"""
+        with self._unrecorded_lock:
+            unrecorded, self._unrecorded = self._unrecorded, []
+        for index, (message_id, sent_at) in enumerate(unrecorded):
+            try:
+                self._mark_sent(message_id, sent_at)
+            except Exception as e:
+                print(f"Error marking outbox messages as sent: {str(e)}")
+                with self._unrecorded_lock:
+                    self._unrecorded.extend(unrecorded[index:])
+                return
+
+    def _mark_sent(self, message_id, sent_at):
+        self.collection.update_one(
+            {'_id': message_id},
+            {'$set': {'status': 'sent', 'sent_at': sent_at, 'last_error': None}, '$inc': {'attempts': 1}}
+        )
+
+    def record_failure(self, doc, error):
+        """Schedule a retry with exponential backoff, or give up after max_attempts"""
+        attempts = doc.get('attempts', 0) + 1
+        update = {'attempts': attempts, 'last_error': str(error)}
+        if attempts >= self.max_attempts:
+            update['status'] = 'failed'
+        else:
+            update['status'] = 'pending'
+            update['next_attempt_at'] = datetime.utcnow() + timedelta(seconds=self.backoff_seconds * 2 ** (attempts - 1))
+        self.collection.update_one({'_id': doc['_id']}, {'$set': update})
+        print(f"Error sending email to {doc['to']} (attempt {attempts}): {str(error)}")
+
+    def drain(self, worker_id=0):
+        """Send everything currently due on one connection, returning the number of messages processed"""
+        processed = 0
+        connection = None
+        try:
+            while True:
+                self.flush_sent()
+                batch = self.claim_batch(worker_id)
+                if not batch:
+                    break
+                connection = self.send_batch(connection, batch)
+                processed += len(batch)
+        finally:
+            _close(connection)
+        return processed
+
+    def _run(self, worker_id):
+        connection = None
+        last_used = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.flush_sent()
+                batch = self.claim_batch(worker_id)
+            except Exception as e:
+                print(f"Error claiming outbox messages: {str(e)}")
+                batch = []
+            if batch:
+                try:
+                    connection = self.send_batch(connection, batch)
+                except Exception as e:
+                    # Whatever went wrong, the worker must keep draining the outbox
+                    print(f"Error sending outbox batch: {str(e)}")
+                last_used = time.monotonic()
+                continue
+            # Drop the connection once it has been idle for a while
+            if connection is not None and time.monotonic() - last_used > self.idle_timeout:
+                _close(connection)
+                connection = None
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+        _close(connection)
+
+
+def _close(connection):
+    if connection is None:
+        return
+    try:
+        connection.quit()
+    except Exception:
+        pass
@@ -0,0 +1,57 @@
+"""Password hashing on a bounded worker pool.
+
+Hashing and verifying a password costs tens of milliseconds of CPU by
+design. PasswordHasher runs that work on a fixed number of threads, so a
+burst of logins uses at most that many cores and leaves the rest of the
+request workers free. hashlib's scrypt and pbkdf2 release the GIL, so the
+threads really do run in parallel. When more than the queue allows are
+already waiting, callers get HasherBusy straight away instead of piling up.
+
+The hash method is configurable (any werkzeug method string, e.g.
+'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'). Hashes stored with other
+parameters still verify, and needs_rehash() tells the caller when to
+replace one after a successful login.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full"""
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded thread pool"""
+
+    def __init__(self, method='scrypt', workers=2, queue_size=64):
+        # werkzeug fills in the default parameters, so 'scrypt' becomes 'scrypt:32768:8:1'
+        self.method = generate_password_hash('', method=method).split('$', 1)[0]
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """Check a password against a stored hash of any supported method"""
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """Whether a stored hash was made with other parameters than the configured ones"""
+        return stored_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,302 @@
+"""Job recommendations from a hashed TF-IDF matrix of job texts.
+
+Every job is turned into a sparse vector of hashed word features (the
+feature hashing trick, so there is no vocabulary to keep in sync between
+workers) with sublinear term frequencies, L2-normalised. The vectors are
+kept as a job-by-feature matrix stored column by column: for each feature,
+the rows of the jobs that contain it. Scoring a seeker's profile is then one
+sparse matrix-vector product, done as a weighted bincount over the posting
+lists of the profile's features, followed by an argpartition top-k.
+
+Inverse document frequencies are taken from the posting list lengths when
+a profile is scored, so adding jobs never means re-weighting stored ones.
+New jobs land in a small pending list that is scored directly and merged
+into the matrix in the background once it grows. Jobs posted through other
+workers are picked up on a background thread that polls the jobs generation
+stamp.
+
+numpy is imported on first use, like the plotting stack.
+"""
+import math
+import re
+import threading
+import time
+import zlib
+from datetime import timedelta
+from itertools import chain
+
+from bson import ObjectId
+
+from search import jobs_generation
+
+N_FEATURES = 2 ** 20
+
+# Field weights of the texts that make up a job and a seeker profile
+JOB_TEXT_WEIGHTS = (('title', 2.0), ('requirements', 2.0), ('description', 1.0))
+PROFILE_TEXT_WEIGHTS = (('skills', 3.0), ('experience', 1.0), ('education', 1.0))
+JOB_TEXT_PROJECTION = {field: 1 for field, _ in JOB_TEXT_WEIGHTS}
+
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have in is it of on or our the their this to we will with you your'.split()
+)
+
+_TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+
+def feature_vector(weighted_texts, n_features=N_FEATURES):
+    """{feature: weight} for (text, field weight) pairs: hashed words, sublinear tf, unit length"""
+    counts = {}
+    for text, weight in weighted_texts:
+        for token in _TOKEN.findall(str(text or '').lower()):
+            if len(token) < 2 or token in STOP_WORDS:
+                continue
+            feature = zlib.crc32(token.encode()) % n_features
+            counts[feature] = counts.get(feature, 0.0) + weight
+    vector = {feature: 1.0 + math.log(count) for feature, count in counts.items()}
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {feature: value / norm for feature, value in vector.items()} if norm else {}
+
+
+def job_vector(job, n_features=N_FEATURES):
+    return feature_vector(((job.get(field), weight) for field, weight in JOB_TEXT_WEIGHTS), n_features)
+
+
+def profile_vector(profile, n_features=N_FEATURES):
+    return feature_vector(((profile.get(field), weight) for field, weight in PROFILE_TEXT_WEIGHTS), n_features)
+
+
+class JobMatrix:
+    """Immutable job-by-feature matrix stored as one posting list per feature"""
+
+    def __init__(self, features, starts, rows, values, n_rows):
+        self.features = features  # sorted feature ids
+        self.starts = starts      # posting list i is rows/values[starts[i]:starts[i + 1]]
+        self.rows = rows
+        self.values = values
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_entries(cls, features, rows, values, n_rows):
+        import numpy as np
+        order = np.argsort(features, kind='stable')
+        features, rows, values = features[order], rows[order], values[order]
+        unique, starts = np.unique(features, return_index=True)
+        return cls(unique, np.append(starts, len(features)), rows, values, n_rows)
+
+    @classmethod
+    def build(cls, vectors, first_row=0):
+        """Matrix holding the given {feature: weight} vectors as rows first_row, first_row + 1, ..."""
+        import numpy as np
+        lengths = np.fromiter((len(vector) for vector in vectors), dtype=np.int64, count=len(vectors))
+        total = int(lengths.sum())
+        features = np.fromiter(chain.from_iterable(vectors), dtype=np.int32, count=total)
+        values = np.fromiter(chain.from_iterable(vector.values() for vector in vectors), dtype=np.float32, count=total)
+        rows = np.repeat(np.arange(first_row, first_row + len(vectors), dtype=np.int32), lengths)
+        return cls.from_entries(features, rows, values, first_row + len(vectors))
+
+    def merged(self, other):
+        """A matrix holding the rows of both"""
+        import numpy as np
+        features = np.concatenate([
+            np.repeat(self.features, np.diff(self.starts)),
+            np.repeat(other.features, np.diff(other.starts))
+        ])
+        return JobMatrix.from_entries(
+            features,
+            np.concatenate([self.rows, other.rows]),
+            np.concatenate([self.values, other.values]),
+            max(self.n_rows, other.n_rows)
+        )
+
+    def _postings(self, feature):
+        i = int(self.features.searchsorted(feature))
+        if i < len(self.features) and self.features[i] == feature:
+            return self.starts[i], self.starts[i + 1]
+        return None
+
+    def document_frequency(self, feature):
+        postings = self._postings(feature)
+        return int(postings[1] - postings[0]) if postings else 0
+
+    def scores(self, query, n_rows=None):
+        """Matrix-vector product with a sparse {feature: weight} query, as a dense array of n_rows"""
+        import numpy as np
+        rows, weights = [], []
+        for feature, weight in query.items():
+            postings = self._postings(feature)
+            if postings:
+                start, end = postings
+                rows.append(self.rows[start:end])
+                weights.append(self.values[start:end] * weight)
+        n_rows = n_rows or self.n_rows
+        if not rows:
+            return np.zeros(n_rows, dtype=np.float64)
+        return np.bincount(np.concatenate(rows), weights=np.concatenate(weights), minlength=n_rows)
+
+
+def top_k(scores, k):
+    """Indices of the k highest positive scores, best first"""
+    import numpy as np
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[scores[candidates] > 0]
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+class JobRecommender:
+    """Per-process recommendation index over job_posts, built in the background on first use"""
+
+    def __init__(self, db, n_features=N_FEATURES, refresh_seconds=30, merge_threshold=2000):
+        self.db = db
+        self.n_features = n_features
+        self.refresh_seconds = refresh_seconds
+        self.merge_threshold = merge_threshold
+        self._lock = threading.Lock()
+        self._state = 'idle'
+        self._matrix = None
+        self._job_ids = []
+        self._row_of = {}
+        self._pending = []
+        self._merging = False
+        self._refreshing = False
+        self._max_id = None
+        self._generation = None
+        self._checked_at = 0.0
+
+    def start(self):
+        """Build the index on a background thread unless that has already begun"""
+        with self._lock:
+            if self._state != 'idle':
+                return
+            self._state = 'building'
+        threading.Thread(target=self._build, name='job-recommender', daemon=True).start()
+
+    def _build(self):
+        try:
+            generation = jobs_generation(self.db)
+            job_ids, vectors = [], []
+            for job in self.db.job_posts.find({}, JOB_TEXT_PROJECTION):
+                job_ids.append(job['_id'])
+                vectors.append(job_vector(job, self.n_features))
+            self.load(job_ids, vectors, generation)
+        except Exception as e:
+            print(f"Error building job recommendations: {str(e)}")
+            with self._lock:
+                self._state = 'idle'
+
+    def load(self, job_ids, vectors, generation=None):
+        """Replace the index with the given jobs and their feature vectors"""
+        matrix = JobMatrix.build(vectors)
+        with self._lock:
+            self._matrix = matrix
+            self._job_ids = list(job_ids)
+            self._row_of = {job_id: row for row, job_id in enumerate(self._job_ids)}
+            self._max_id = max(self._job_ids, default=None)
+            self._pending = []
+            self._generation = generation
+            self._checked_at = time.monotonic()
+            self._state = 'ready'
+
+    def add_job(self, job):
+        """Index a job that was just inserted"""
+        with self._lock:
+            if self._state != 'ready' or job['_id'] in self._row_of:
+                return
+            row = len(self._job_ids)
+            self._job_ids.append(job['_id'])
+            self._row_of[job['_id']] = row
+            self._pending.append((row, job_vector(job, self.n_features)))
+            if self._max_id is None or job['_id'] > self._max_id:
+                self._max_id = job['_id']
+            merge = len(self._pending) >= self.merge_threshold and not self._merging
+            if merge:
+                self._merging = True
+        if merge:
+            threading.Thread(target=self._merge, name='job-recommender-merge', daemon=True).start()
+
+    def _merge(self):
+        try:
+            with self._lock:
+                pending = list(self._pending)
+            added = JobMatrix.build([vector for _, vector in pending], first_row=pending[0][0])
+            matrix = self._matrix.merged(added)
+            with self._lock:
+                self._matrix = matrix
+                self._pending = self._pending[len(pending):]
+        except Exception as e:
+            print(f"Error merging job recommendations: {str(e)}")
+        finally:
+            with self._lock:
+                self._merging = False
+
+    def _start_refresh(self):
+        """Look for jobs other workers inserted, on a background thread, at most every refresh_seconds"""
+        with self._lock:
+            now = time.monotonic()
+            if self._refreshing or now - self._checked_at < self.refresh_seconds:
+                return
+            self._checked_at = now
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name='job-recommender-refresh', daemon=True).start()
+
+    def _refresh(self):
+        try:
+            generation = jobs_generation(self.db)
+            with self._lock:
+                if generation == self._generation:
+                    return
+                newest = self._max_id
+            query = {}
+            if newest:
+                # Ids are only roughly ordered across workers, so look back a little; known jobs are skipped
+                query = {'_id': {'$gt': ObjectId.from_datetime(newest.generation_time - timedelta(minutes=5))}}
+            for job in self.db.job_posts.find(query, JOB_TEXT_PROJECTION):
+                self.add_job(job)
+            with self._lock:
+                self._generation = generation
+        except Exception as e:
+            print(f"Error refreshing job recommendations: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def recommend(self, profile, k=10, exclude=()):
+        """[(job _id, score)] of the k jobs best matching a profile, best first; [] until the index is built"""
+        if self._state != 'ready':
+            self.start()
+            return []
+        self._start_refresh()
+
+        query = profile_vector(profile or {}, self.n_features)
+        if not query:
+            return []
+        with self._lock:
+            matrix, pending, job_ids = self._matrix, list(self._pending), self._job_ids
+            n_rows = len(job_ids)
+            excluded = [self._row_of[job_id] for job_id in exclude if job_id in self._row_of]
+
+        # Weight the query by idf twice: once for its own side, once for the jobs'
+        weights = {}
+        for feature, value in query.items():
+            df = matrix.document_frequency(feature) + sum(1 for _, vector in pending if feature in vector)
+            idf = math.log((1 + n_rows) / (1 + df)) + 1
+            weights[feature] = value * idf * idf
+
+        scores = matrix.scores(weights, n_rows)
+        for row, vector in pending:
+            if row >= matrix.n_rows:
+                scores[row] = sum(weight * vector.get(feature, 0.0) for feature, weight in weights.items())
+        scores[excluded] = 0
+        return [(job_ids[row], float(scores[row])) for row in top_k(scores, k)]
+
+    def stats(self):
+        """Index size and state"""
+        with self._lock:
+            return {
+                'state': self._state,
+                'jobs': len(self._job_ids),
+                'pending': len(self._pending),
+                'entries': int(len(self._matrix.rows)) if self._matrix is not None else 0
+            }
@@ -0,0 +1,228 @@
+"""Query-result cache for job listings.
+
+ResultCache keeps BSON-encoded query results in an LRU bounded by bytes. Keys
+carry the jobs generation (see search.jobs_generation), so a write to
+job_posts makes every older entry unreachable and it simply ages out. When
+several threads miss on the same key at once, one of them runs the query
+and the others wait for its result (singleflight), so a burst of requests
+right after an invalidation costs MongoDB a single query per key.
+
+An optional SqliteBackend, a SQLite file on local disk (ideally tmpfs such
+as /dev/shm), shares results between the worker processes of one host.
+Results are stored as BSON rather than pickles, so whoever can write to that
+file can at worst poison listings, not run code in the workers; the file
+should still be private to the app user (mode 0600).
+
+Values come back as BSON gives them: tuples as lists, datetimes naive UTC.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import bson
+
+
+def encode_result(value):
+    return bson.encode({'value': value})
+
+
+def decode_result(blob):
+    return bson.decode(blob)['value']
+
+
+class CachedStamp:
+    """A stamp such as the jobs generation, re-read at most every max_age seconds"""
+
+    def __init__(self, read, max_age=1.0):
+        self.read = read
+        self.max_age = max_age
+        self._value = None
+        self._read_at = None
+        self._lock = threading.Lock()
+
+    def value(self):
+        with self._lock:
+            if self._read_at is not None and time.monotonic() - self._read_at < self.max_age:
+                return self._value
+        value = self.read()
+        with self._lock:
+            self._value = value
+            self._read_at = time.monotonic()
+        return value
+
+    def invalidate(self):
+        """Re-read the stamp on next use, e.g. right after this process bumped it"""
+        with self._lock:
+            self._read_at = None
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.blob = None
+        self.error = None
+
+
+class SqliteBackend:
+    """Results shared between the workers of one host through a SQLite file"""
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, prune_every=100):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.prune_every = prune_every
+        self._sets = 0
+        self._local = threading.local()
+        if not os.path.exists(path):
+            # Only the app user may read or write the shared results
+            os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600))
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB, size INTEGER, stored_at REAL)'
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _key(key):
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def get(self, key):
+        try:
+            row = self._connection().execute('SELECT value FROM results WHERE key = ?', (self._key(key),)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            print(f"Error reading shared result cache: {str(e)}")
+            return None
+
+    def set(self, key, blob):
+        try:
+            connection = self._connection()
+            connection.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, stored_at) VALUES (?, ?, ?, ?)',
+                (self._key(key), blob, len(blob), time.time())
+            )
+            self._sets += 1
+            if self._sets % self.prune_every == 0:
+                self.prune(connection)
+        except sqlite3.Error as e:
+            print(f"Error writing shared result cache: {str(e)}")
+
+    def prune(self, connection=None):
+        """Drop the oldest results until the file holds at most max_bytes of them"""
+        connection = connection or self._connection()
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        stale, freed = [], 0
+        for key, size in connection.execute('SELECT key, size FROM results ORDER BY stored_at'):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        connection.executemany('DELETE FROM results WHERE key = ?', stale)
+
+
+class ResultCache:
+    """Byte-bounded LRU of query results with singleflight loading"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, shared=None):
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, load):
+        """The cached result for key, calling load() once for all concurrent misses"""
+        if self.max_bytes <= 0 and self.shared is None:
+            return load()
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return decode_result(blob)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return decode_result(flight.blob)
+
+        try:
+            blob = self.shared.get(key) if self.shared else None
+            if blob is None:
+                value = load()
+                blob = encode_result(value)
+                if self.shared:
+                    self.shared.set(key, blob)
+                with self._lock:
+                    self.misses += 1
+            else:
+                value = decode_result(blob)
+                with self._lock:
+                    self.shared_hits += 1
+            self._store(key, blob)
+            flight.blob = blob
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _store(self, key, blob):
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = blob
+            self._bytes += len(blob)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Hit, miss, coalescing and size counters"""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_ratio': (self.hits + self.shared_hits) / lookups if lookups else 0.0
+            }
@@ -0,0 +1,155 @@
+"""Resume storage on GridFS.
+
+Resumes are content-addressed: each upload is hashed (SHA-256) as it is read,
+and identical content is stored once and shared. Every GridFS file carries a
+refcount of the users pointing at it; a file is deleted when its last
+reference goes away, and collect_garbage() sweeps up anything orphaned.
+"""
+import hashlib
+import mimetypes
+from datetime import datetime, timedelta
+
+from flask import current_app, request
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from werkzeug.wsgi import wrap_file
+
+HASH_CHUNK_SIZE = 256 * 1024
+
+
+class ResumeTooLarge(Exception):
+    """Raised when an upload exceeds the configured size cap"""
+
+
+def hash_upload(stream, max_bytes):
+    """SHA-256 an upload stream in chunks, enforcing the size cap, returning (digest, size)"""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = stream.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise ResumeTooLarge(f'Resume exceeds {max_bytes} bytes')
+        digest.update(chunk)
+    return digest.hexdigest(), size
+
+
+def _add_reference(db, digest):
+    """Take a reference on an existing file with this content, returning its id or None"""
+    doc = db.fs.files.find_one_and_update(
+        {'sha256': digest},
+        {'$inc': {'refcount': 1}},
+        projection={'_id': 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return doc['_id'] if doc else None
+
+
+def store_resume(db, fs, stream, filename, max_bytes=None):
+    """Store an uploaded resume, reusing an identical stored file when there is one.
+
+    Returns the GridFS file id, which the caller now holds one reference to.
+    """
+    digest, size = hash_upload(stream, max_bytes)
+    file_id = _add_reference(db, digest)
+    if file_id:
+        return file_id
+
+    stream.seek(0)
+    file_id = fs.put(stream, filename=filename, refcount=1)
+    try:
+        # The unique sha256 index settles concurrent uploads of the same content
+        db.fs.files.update_one({'_id': file_id}, {'$set': {'sha256': digest}})
+    except DuplicateKeyError:
+        fs.delete(file_id)
+        stream.seek(0)
+        return store_resume(db, fs, stream, filename, max_bytes)
+    return file_id
+
+
+def release_resume(db, file_id):
+    """Drop one reference to a stored resume, deleting it when none remain"""
+    if not file_id:
+        return
+    db.fs.files.update_one({'_id': file_id}, {'$inc': {'refcount': -1}})
+    # Delete only if no new reference was taken in the meantime
+    if db.fs.files.find_one_and_delete({'_id': file_id, 'refcount': {'$lte': 0}}, projection={'_id': 1}):
+        db.fs.chunks.delete_many({'files_id': file_id})
+
+
+def find_orphans(db, grace_seconds=3600):
+    """GridFS files that no user references, skipping uploads still within the grace period"""
+    pipeline = [
+        {'$match': {'uploadDate': {'$lt': datetime.utcnow() - timedelta(seconds=grace_seconds)}}},
+        {
+            '$lookup': {
+                'from': 'users',
+                'localField': '_id',
+                'foreignField': 'resume_id',
+                'pipeline': [{'$project': {'_id': 1}}, {'$limit': 1}],
+                'as': 'references'
+            }
+        },
+        {'$match': {'references': {'$size': 0}}},
+        {'$project': {'filename': 1, 'length': 1, 'uploadDate': 1, 'sha256': 1, 'refcount': 1}}
+    ]
+    return db.fs.files.aggregate(pipeline)
+
+
+def collect_garbage(db, dry_run=True, grace_seconds=3600):
+    """Remove (or with dry_run, only list) orphaned GridFS files, returning the orphans found"""
+    orphans = []
+    for doc in find_orphans(db, grace_seconds):
+        if dry_run:
+            orphans.append(doc)
+        elif _delete_orphan(db, doc):
+            orphans.append(doc)
+    return orphans
+
+
+def _delete_orphan(db, doc):
+    """Delete an orphan unless an upload took a reference to it since it was found"""
+    # Without its sha256 no upload can match the file any more; the refcount guard
+    # fails if one took a reference between the scan and now
+    detached = db.fs.files.update_one(
+        {'_id': doc['_id'], 'refcount': doc.get('refcount')},
+        {'$unset': {'sha256': ''}}
+    )
+    if not detached.modified_count and 'sha256' in doc:
+        return False
+    if db.users.find_one({'resume_id': doc['_id']}, {'_id': 1}):
+        # A reference taken just before the scan has reached its user; keep the file shareable
+        if 'sha256' in doc:
+            try:
+                db.fs.files.update_one({'_id': doc['_id']}, {'$set': {'sha256': doc['sha256']}})
+            except DuplicateKeyError:
+                pass
+        return False
+    if not db.fs.files.find_one_and_delete({'_id': doc['_id'], 'refcount': doc.get('refcount')}, projection={'_id': 1}):
+        return False
+    db.fs.chunks.delete_many({'files_id': doc['_id']})
+    return True
+
+
+def gridfs_download_response(grid_out, download_name):
+    """Stream a GridFS file as an attachment, honouring Range and conditional requests.
+
+    The body is read chunk by chunk from GridFS as the client consumes it, so
+    worker memory stays flat however large the file is. GridFS files never
+    change once written, which makes the stored md5 (or the file id when no
+    md5 was recorded) a strong validator: a matching If-None-Match or
+    If-Modified-Since gets a 304 without reading any chunks.
+    """
+    mimetype = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    data = wrap_file(request.environ, grid_out, buffer_size=grid_out.chunk_size)
+    response = current_app.response_class(data, mimetype=mimetype, direct_passthrough=True)
+    response.content_length = grid_out.length
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    response.set_etag(getattr(grid_out, 'md5', None) or str(grid_out._id))
+    response.last_modified = grid_out.upload_date
+    # Browsers may keep a copy but must revalidate it, which costs a 304
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request.environ, accept_ranges=True, complete_length=grid_out.length)
@@ -0,0 +1,202 @@
+"""Analytics rollups maintained incrementally as the routes write.
+
+Each rollup collection holds one small counter document per category, day,
+status or role. The write paths bump them with $inc, so analytics reads cost
+O(number of categories/days) instead of a scan over every job or application.
+rebuild_rollups() recomputes them from scratch and check_rollups() reports
+any drift between the counters and the source collections.
+"""
+import math
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from analytics import application_stats, category_stats, user_role_counts
+
+CATEGORY_ROLLUP = 'rollup_categories'
+DAILY_APPLICATIONS_ROLLUP = 'rollup_daily_applications'
+STATUS_ROLLUP = 'rollup_application_status'
+ROLE_ROLLUP = 'rollup_user_roles'
+ROLLUP_META = 'rollup_meta'
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _day(moment):
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def record_job_posted(db, job):
+    """Count a new job post towards its category"""
+    record_jobs_posted(db, [job])
+
+
+def record_jobs_posted(db, jobs):
+    """Count a batch of new job posts, with one update per category"""
+    totals = {}
+    for job in jobs:
+        salaried = _is_number(job.get('salary'))
+        counts = totals.setdefault(job.get('category'), {'job_count': 0, 'salary_total': 0, 'salary_count': 0})
+        counts['job_count'] += 1
+        counts['salary_total'] += job['salary'] if salaried else 0
+        counts['salary_count'] += 1 if salaried else 0
+    if not totals:
+        return
+    try:
+        db[CATEGORY_ROLLUP].bulk_write(
+            [UpdateOne({'_id': category}, {'$inc': counts}, upsert=True) for category, counts in totals.items()],
+            ordered=False
+        )
+    except Exception as e:
+        print(f"Error updating category rollup: {str(e)}")
+
+
+def record_application(db, application):
+    """Count a new application towards its day and status"""
+    try:
+        db[DAILY_APPLICATIONS_ROLLUP].update_one(
+            {'_id': _day(application['date_applied'])}, {'$inc': {'count': 1}}, upsert=True
+        )
+        db[STATUS_ROLLUP].update_one({'_id': application['status']}, {'$inc': {'count': 1}}, upsert=True)
+    except Exception as e:
+        print(f"Error updating application rollups: {str(e)}")
+
+
+def record_status_change(db, old_status, new_status):
+    """Move one application from one status bucket to another"""
+    record_status_changes(db, [(old_status, new_status)])
+
+
+def record_status_changes(db, changes):
+    """Move applications between status buckets, given (old status, new status) pairs"""
+    deltas = {}
+    for old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        deltas[old_status] = deltas.get(old_status, 0) - 1
+        deltas[new_status] = deltas.get(new_status, 0) + 1
+    deltas = {status: delta for status, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    try:
+        db[STATUS_ROLLUP].bulk_write(
+            [UpdateOne({'_id': status}, {'$inc': {'count': delta}}, upsert=True) for status, delta in deltas.items()],
+            ordered=False
+        )
+    except Exception as e:
+        print(f"Error updating status rollup: {str(e)}")
+
+
+def record_user_registered(db, role):
+    """Count a new user towards their role"""
+    try:
+        db[ROLE_ROLLUP].update_one({'_id': role}, {'$inc': {'count': 1}}, upsert=True)
+    except Exception as e:
+        print(f"Error updating role rollup: {str(e)}")
+
+
+def rollups_built(db):
+    """Whether the rollups have been built at least once"""
+    return db[ROLLUP_META].find_one({'_id': 'rollups'}) is not None
+
+
+def compute_rollups(db):
+    """Recompute every rollup from the source collections, as {collection: [documents]}"""
+    applications = application_stats(db)
+    return {
+        CATEGORY_ROLLUP: [
+            {'_id': cat['_id'], 'job_count': cat['count'], 'salary_total': cat['salary_total'], 'salary_count': cat['salary_count']}
+            for cat in category_stats(db)
+        ],
+        DAILY_APPLICATIONS_ROLLUP: [{'_id': row['_id'], 'count': row['count']} for row in applications['per_day']],
+        STATUS_ROLLUP: [{'_id': row['_id'], 'count': row['count']} for row in applications['statuses']],
+        ROLE_ROLLUP: [{'_id': role, 'count': count} for role, count in user_role_counts(db).items()]
+    }
+
+
+def rebuild_rollups(db):
+    """Recompute the rollups and swap them in, returning the number of documents per rollup.
+
+    Writes that land while the rebuild runs may be missed; run check_rollups()
+    afterwards, or rebuild during a quiet period.
+    """
+    sizes = {}
+    for name, docs in compute_rollups(db).items():
+        staging = db[f'{name}_rebuild']
+        staging.drop()
+        if docs:
+            staging.insert_many(docs)
+            staging.rename(name, dropTarget=True)
+        else:
+            db[name].drop()
+        sizes[name] = len(docs)
+    db[ROLLUP_META].update_one({'_id': 'rollups'}, {'$set': {'built_at': datetime.utcnow()}}, upsert=True)
+    return sizes
+
+
+def _same_counters(expected, actual):
+    """Whether two counter documents agree, allowing float sums added up in different orders to differ slightly"""
+    if expected is None or actual is None or expected.keys() != actual.keys():
+        return expected == actual
+    for field, value in expected.items():
+        other = actual[field]
+        if isinstance(value, float) or isinstance(other, float):
+            if not (_is_number(value) and _is_number(other) and math.isclose(value, other, rel_tol=1e-9, abs_tol=1e-6)):
+                return False
+        elif value != other:
+            return False
+    return True
+
+
+def check_rollups(db):
+    """Compare the rollups to a fresh recomputation, returning a list of mismatches"""
+    mismatches = []
+    for name, docs in compute_rollups(db).items():
+        expected = {doc['_id']: {k: v for k, v in doc.items() if k != '_id'} for doc in docs}
+        actual = {}
+        for doc in db[name].find():
+            values = {k: v for k, v in doc.items() if k != '_id'}
+            # Buckets that were emptied by status moves are equivalent to missing ones
+            if any(values.values()):
+                actual[doc['_id']] = values
+        for key in expected.keys() | actual.keys():
+            if not _same_counters(expected.get(key), actual.get(key)):
+                mismatches.append({'rollup': name, 'key': key, 'expected': expected.get(key), 'actual': actual.get(key)})
+    return mismatches
+
+
+def read_category_stats(db):
+    """Category stats in the shape of analytics.category_stats(), from the rollup when built"""
+    if not rollups_built(db):
+        return category_stats(db)
+    stats = []
+    for doc in db[CATEGORY_ROLLUP].find().sort([('job_count', -1), ('_id', 1)]):
+        if not doc['job_count']:
+            continue
+        stats.append({
+            '_id': doc['_id'],
+            'count': doc['job_count'],
+            'avg_salary': doc['salary_total'] / doc['salary_count'] if doc['salary_count'] else None,
+            'salary_total': doc['salary_total'],
+            'salary_count': doc['salary_count']
+        })
+    return stats
+
+
+def read_application_stats(db):
+    """Application stats in the shape of analytics.application_stats(), from the rollups when built"""
+    if not rollups_built(db):
+        return application_stats(db)
+    return {
+        'statuses': list(db[STATUS_ROLLUP].find({'count': {'$gt': 0}}).sort([('count', -1), ('_id', 1)])),
+        'per_day': list(db[DAILY_APPLICATIONS_ROLLUP].find({'count': {'$gt': 0}}).sort('_id', 1))
+    }
+
+
+def read_user_role_counts(db):
+    """Users per role, from the rollup when built"""
+    if not rollups_built(db):
+        return user_role_counts(db)
+    return {doc['_id']: doc['count'] for doc in db[ROLE_ROLLUP].find()}
@@ -0,0 +1,273 @@
+"""Job search helpers shared by the job listing routes."""
+import base64
+import copy
+import re
+import threading
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+# Weighted text index over the searchable job fields. A match in the title
+# ranks higher than a match in the company name, requirements or description.
+JOB_SEARCH_INDEX = 'job_search_text'
+JOB_SEARCH_WEIGHTS = {
+    'title': 10,
+    'company_name': 5,
+    'requirements': 3,
+    'description': 1
+}
+
+# Fields carried by a job listing card. The description is cut down to an
+# excerpt so a page never ships full descriptions or contact details.
+JOB_CARD_EXCERPT_LENGTH = 200
+JOB_CARD_PROJECTION = {
+    'title': 1,
+    'company_name': 1,
+    'category': 1,
+    'location': 1,
+    'salary': 1,
+    'date_posted': 1,
+    'description': {'$substrCP': [{'$ifNull': ['$description', '']}, 0, JOB_CARD_EXCERPT_LENGTH]}
+}
+
+# Newest first; _id breaks ties between jobs posted at the same instant
+JOB_LISTING_SORT = [('date_posted', -1), ('_id', -1)]
+
+# Counter bumped on every job_posts write, so listings can be validated without querying them
+JOBS_GENERATION_COLLECTION = 'search_meta'
+
+
+def job_filters_from_args(args):
+    """Read the search and filter parameters from a request args mapping"""
+    min_salary = args.get('min_salary', '').strip()
+    return {
+        'search': args.get('search', '').strip(),
+        'category': args.get('category', '').strip(),
+        'location': args.get('location', '').strip(),
+        'min_salary': min_salary if min_salary.isdigit() else ''
+    }
+
+
+def build_job_query(filters):
+    """Build the job_posts query for the given filters"""
+    query = {}
+
+    # Full-text search over title, company name, description and requirements
+    # Runs of whitespace count as one space, as in normalize_filters()
+    if filters['search']:
+        query['$text'] = {'$search': ' '.join(filters['search'].split())}
+
+    # Category filter
+    if filters['category']:
+        query['category'] = filters['category']
+
+    # Location filter
+    if filters['location']:
+        pattern = r'\s+'.join(re.escape(word) for word in filters['location'].split())
+        query['location'] = {'$regex': pattern, '$options': 'i'}
+
+    # Minimum salary filter
+    if filters['min_salary']:
+        query['salary'] = {'$gte': float(filters['min_salary'])}
+
+    return query
+
+
+def bump_jobs_generation(db):
+    """Record a write to job_posts"""
+    db[JOBS_GENERATION_COLLECTION].update_one({'_id': 'job_posts'}, {'$inc': {'generation': 1}}, upsert=True)
+
+
+def jobs_generation(db):
+    """Stamp that changes whenever job_posts does.
+
+    The document count is folded in so jobs written outside the app (imports
+    straight into MongoDB, the benchmark seeder) still change the stamp.
+    """
+    meta = db[JOBS_GENERATION_COLLECTION].find_one({'_id': 'job_posts'}) or {}
+    return f"{meta.get('generation', 0)}.{db.job_posts.estimated_document_count()}"
+
+
+def encode_cursor(value):
+    """Encode a page cursor as an opaque URL-safe token"""
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a page cursor token, returning None when it is malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        kind, _, value = base64.urlsafe_b64decode(padded.encode()).decode().partition('|')
+        if kind == 'offset':
+            return kind, max(int(value), 0)
+        if kind == 'after':
+            date_posted, _, job_id = value.partition('|')
+            return kind, (datetime.fromisoformat(date_posted), ObjectId(job_id))
+    except Exception:
+        pass
+    return None
+
+
+def _page_plan(query, cursor, projection):
+    """How to fetch one page: (query, sort, skip, projection)"""
+    projection = dict(projection or JOB_CARD_PROJECTION)
+    position = decode_cursor(cursor) if cursor else None
+
+    if '$text' in query:
+        offset = position[1] if position and position[0] == 'offset' else 0
+        projection['score'] = {'$meta': 'textScore'}
+        return query, [('score', {'$meta': 'textScore'})] + JOB_LISTING_SORT, offset, projection
+
+    if position and position[0] == 'after':
+        date_posted, job_id = position[1]
+        query = dict(query)
+        query['$or'] = [
+            {'date_posted': {'$lt': date_posted}},
+            {'date_posted': date_posted, '_id': {'$lt': job_id}}
+        ]
+    return query, JOB_LISTING_SORT, 0, projection
+
+
+def _next_cursor(jobs, query, skip, page_size):
+    """Cursor for the page after jobs, which were fetched with one extra row"""
+    if len(jobs) <= page_size:
+        return None
+    if '$text' in query:
+        return encode_cursor(f"offset|{skip + page_size}")
+    last = jobs[page_size - 1]
+    return encode_cursor(f"after|{last['date_posted'].isoformat()}|{last['_id']}")
+
+
+def fetch_job_page(collection, query, cursor='', page_size=20, projection=None):
+    """Fetch one page of jobs for a query, returning (jobs, next_cursor).
+
+    Listings are paged with a keyset on (date_posted, _id), so every page costs
+    the same no matter how deep it is. Text searches are ranked by relevance,
+    which has no stable key to seek on, so they page by offset instead.
+    """
+    page_query, sort, skip, projection = _page_plan(query, cursor, projection)
+    cursor = collection.find(page_query, projection).sort(sort)
+    if skip:
+        cursor = cursor.skip(skip)
+    jobs = list(cursor.limit(page_size + 1))
+    return jobs[:page_size], _next_cursor(jobs, query, skip, page_size)
+
+
+# Salary band lower bounds; jobs at or above the last one share the top band
+SALARY_BANDS = [0, 300000, 600000, 1000000, 1500000, 2500000]
+# $bucket label for jobs without a numeric salary, which are left out of the bands
+NO_SALARY_BAND = 'none'
+TOP_LOCATIONS = 10
+
+
+def normalize_filters(filters):
+    """Hashable form of the job filters in which equivalent filter sets compare equal.
+
+    Search and location are matched case-insensitively with whitespace runs
+    collapsed (see build_job_query), so they are keyed that way too.
+    """
+    return (
+        ' '.join(filters['search'].lower().split()),
+        filters['category'],
+        ' '.join(filters['location'].lower().split()),
+        str(int(filters['min_salary'])) if filters['min_salary'] else ''
+    )
+
+
+def _count_by(field):
+    """Pipeline counting documents per value of a field, most common first"""
+    return [{'$group': {'_id': field, 'count': {'$sum': 1}}}, {'$sort': {'count': -1, '_id': 1}}]
+
+
+def fetch_job_facets(collection, query, cursor='', page_size=20, projection=None):
+    """Fetch a page of jobs and the filter counts for the whole query in one $facet aggregation.
+
+    Returns (jobs, next_cursor, facets), where facets holds the total, the
+    count per category, the TOP_LOCATIONS most common locations and the count
+    per salary band.
+    """
+    page_query, sort, skip, projection = _page_plan(query, cursor, projection)
+    page = []
+    if page_query is not query:
+        # The cursor only narrows the page, not the counts
+        page.append({'$match': {'$or': page_query['$or']}})
+    page.append({'$sort': dict(sort)})
+    if skip:
+        page.append({'$skip': skip})
+    page += [{'$limit': page_size + 1}, {'$project': projection}]
+
+    result = next(collection.aggregate([
+        {'$match': query},
+        {'$facet': {
+            'page': page,
+            'total': [{'$count': 'count'}],
+            'categories': _count_by('$category'),
+            'locations': _count_by('$location') + [{'$limit': TOP_LOCATIONS}],
+            'salary_bands': [{'$bucket': {
+                'groupBy': '$salary',
+                'boundaries': SALARY_BANDS + [float('inf')],
+                'default': NO_SALARY_BAND,
+                'output': {'count': {'$sum': 1}}
+            }}]
+        }}
+    ]))
+
+    jobs = result['page']
+    bands = {row['_id']: row['count'] for row in result['salary_bands']}
+    facets = {
+        'total': result['total'][0]['count'] if result['total'] else 0,
+        'categories': [{'value': row['_id'], 'count': row['count']} for row in result['categories']],
+        'locations': [{'value': row['_id'], 'count': row['count']} for row in result['locations']],
+        'salary_bands': [
+            {'min': low, 'max': SALARY_BANDS[i + 1] if i + 1 < len(SALARY_BANDS) else None, 'count': bands[low]}
+            for i, low in enumerate(SALARY_BANDS) if bands.get(low)
+        ]
+    }
+    return jobs[:page_size], _next_cursor(jobs, query, skip, page_size), facets
+
+
+class FacetCache:
+    """Short-lived cache of facet counts, keyed by normalized filters"""
+
+    def __init__(self, ttl=30, maxsize=1000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return copy.deepcopy(entry[1])
+        return None
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                # Drop expired entries first, then the oldest
+                now = time.monotonic()
+                for stale in [k for k, entry in self._entries.items() if entry[0] <= now] or [next(iter(self._entries))]:
+                    del self._entries[stale]
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+
+
+def fetch_faceted_job_page(collection, filters, cursor='', page_size=20, cache=None, generation=None):
+    """(jobs, next_cursor, facets) for the filters, reusing cached counts when possible.
+
+    Only the counts are cached, shared by every page of a filter set; caching
+    whole pages is left to the caller's result cache. Passing the jobs
+    generation keeps entries from outliving a write to job_posts.
+    """
+    query = build_job_query(filters)
+    key = (generation, normalize_filters(filters))
+    facets = cache.get(key) if cache else None
+    if facets:
+        jobs, next_cursor = fetch_job_page(collection, query, cursor, page_size)
+        return jobs, next_cursor, facets
+
+    jobs, next_cursor, facets = fetch_job_facets(collection, query, cursor, page_size)
+    if cache:
+        cache.set(key, facets)
+    return jobs, next_cursor, facets
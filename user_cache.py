@@ -0,0 +1,105 @@
+"""Process-level cache of user documents.
+
+Users are cached in a bounded LRU with a TTL, shared by every thread of a
+worker process. Invalidations are written to a small capped collection that
+each worker tails, so a profile change made through one worker evicts the
+stale copy from all of them. Should the tail be interrupted, the listener
+clears the whole cache before resuming, as it may have missed invalidations.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from capped_log import CappedTail
+
+INVALIDATION_COLLECTION = 'user_cache_invalidations'
+INVALIDATION_LOG_BYTES = 1024 * 1024
+
+
+class UserCache:
+    """Thread-safe LRU of user documents keyed by _id, with a TTL"""
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, load):
+        """Return a copy of the cached user, calling load() on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+        user = load()
+        if user is not None:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, user)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return copy.deepcopy(user)
+
+    def evict(self, user_id):
+        """Drop one user from this process's cache"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+
+    def clear(self):
+        """Drop every cached user"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit, miss and size counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations
+            }
+
+
+def invalidate_user(db, cache, user_id):
+    """Evict a user locally and tell the other workers to do the same"""
+    cache.evict(user_id)
+    try:
+        db[INVALIDATION_COLLECTION].insert_one({'user_id': user_id})
+    except Exception as e:
+        print(f"Error publishing user cache invalidation: {str(e)}")
+
+
+class InvalidationListener:
+    """Tails the invalidation log and evicts users, started on the first cache use in each process"""
+
+    def __init__(self, db, cache, retry_interval=1.0):
+        self.cache = cache
+        self._tail = CappedTail(
+            db, INVALIDATION_COLLECTION, INVALIDATION_LOG_BYTES,
+            on_document=lambda doc: cache.evict(doc['user_id']),
+            on_interrupted=cache.clear,
+            retry_interval=retry_interval
+        )
+
+    def ensure_started(self):
+        """Start tailing unless this process already does"""
+        if self._tail.ensure_started():
+            # Entries cached before the tail ran here (e.g. inherited over a fork) may have missed invalidations
+            self.cache.clear()
+
+    def stop(self):
+        """Stop tailing after the current wait"""
+        self._tail.stop()